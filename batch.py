@@ -0,0 +1,184 @@
+import numpy as np
+
+from engine import DEALER_THRESHOLDS, DECK_SIZE, HARD_VALUES, IS_ACE, NERVES_BURN_CHANCE, PAYOUT_STEP
+
+# Hands are int arrays of shape (n_hands, max_cards) using the engine's 0-51
+# card encoding, padded on the right with EMPTY. The lookup tables carry one
+# extra trailing slot so an EMPTY (-1) index reads as "no card".
+EMPTY = -1
+
+HARD_LOOKUP = np.array(HARD_VALUES + (0,), dtype=np.int16)
+ACE_LOOKUP = np.array(IS_ACE + (False,), dtype=bool)
+
+
+# -------------------- ENCODING --------------------
+def encode_hands(hands, width=None):
+    if width is None:
+        width = max((len(h) for h in hands), default=0)
+    out = np.full((len(hands), width), EMPTY, dtype=np.int8)
+    for i, h in enumerate(hands):
+        out[i, :len(h)] = h
+    return out
+
+
+def shuffled_decks(n_tables, rng=None):
+    rng = np.random.default_rng(rng)
+    decks = np.tile(np.arange(DECK_SIZE, dtype=np.int8), (n_tables, 1))
+    return rng.permuted(decks, axis=1)
+
+
+# -------------------- HAND EVALUATION --------------------
+def _totals(hard, has_ace):
+    # engine.hand_total over whole arrays
+    soft = has_ace & (hard <= 11)
+    return hard + 10 * soft, soft
+
+
+def hand_totals(cards):
+    cards = np.asarray(cards)
+    hard = HARD_LOOKUP[cards].sum(axis=1, dtype=np.int16)
+    return _totals(hard, ACE_LOOKUP[cards].any(axis=1))
+
+
+def evaluate_hands(cards):
+    cards = np.asarray(cards)
+    totals, soft = hand_totals(cards)
+    n_cards = (cards != EMPTY).sum(axis=1)
+    bust = totals > 21
+    blackjack = (n_cards == 2) & (totals == 21)
+    return totals, soft, bust, blackjack
+
+
+# -------------------- DEALER PLAY-OUT --------------------
+def dealer_playout(dealer, draws, ai="Normal", nerves=0, rng=None):
+    # Vectorized Game.finish_dealer across independent tables. dealer holds
+    # each table's dealer hand, draws the cards each table would pop next,
+    # in order. Returns final totals, bust mask, cards drawn per table and
+    # the burned card per table (EMPTY when nothing was burned).
+    draws = np.asarray(draws)
+
+    def draw(idx, drawn):
+        if drawn.max() >= draws.shape[1]:
+            raise ValueError("ran out of draw cards for at least one table")
+        return draws[idx, drawn[idx]]
+
+    return _playout(dealer, draw, ai, nerves, rng)
+
+
+def _playout(dealer, draw, ai, nerves, rng):
+    # draw(idx, drawn) gives the next card for the tables in idx, where
+    # drawn counts the cards each table has drawn so far
+    dealer = np.array(dealer, dtype=np.int8)
+    n_tables = dealer.shape[0]
+    rows = np.arange(n_tables)
+
+    burned = np.full(n_tables, EMPTY, dtype=np.int8)
+    chance = NERVES_BURN_CHANCE[nerves]
+    if chance > 0:
+        # dealer stress mechanic: burn one card other than the first
+        rng = np.random.default_rng(rng)
+        n_cards = (dealer != EMPTY).sum(axis=1)
+        burn = (n_cards > 1) & (rng.random(n_tables) < chance)
+        pick = 1 + (rng.random(n_tables) * np.maximum(n_cards - 1, 1)).astype(np.intp)
+        burned[burn] = dealer[rows[burn], pick[burn]]
+        dealer[rows[burn], pick[burn]] = EMPTY
+
+    hard = HARD_LOOKUP[dealer].sum(axis=1, dtype=np.int16)
+    has_ace = ACE_LOOKUP[dealer].any(axis=1)
+    totals, _ = _totals(hard, has_ace)
+
+    base = DEALER_THRESHOLDS[ai] + nerves
+    drawn = np.zeros(n_tables, dtype=np.int16)
+    active = totals < base
+    while active.any():
+        idx = rows[active]
+        card = draw(idx, drawn)
+        hard[idx] += HARD_LOOKUP[card]
+        has_ace[idx] |= ACE_LOOKUP[card]
+        drawn[idx] += 1
+        totals, _ = _totals(hard, has_ace)
+        active = totals < base
+
+    return totals, totals > 21, drawn, burned
+
+
+# -------------------- WHOLE ROUNDS --------------------
+def play_rounds(rounds, threshold=17, ai="Normal", cards=0, nerves=0, payout=0, bet=100,
+                decks=1, rng=None):
+    # Whole rounds for a player who hits below threshold, every round at
+    # once: Game.deal's Starting Luck and naturals, the player's hits, then
+    # finish_dealer for the hands that stood. Each round is dealt from its
+    # own freshly shuffled shoe, so unlike a Game there is no penetration
+    # and no depletion carried from one round to the next. Returns the
+    # counts simulate.play_chunk returns.
+    rng = np.random.default_rng(rng)
+    size = DECK_SIZE * decks
+    shoe = np.tile(np.tile(np.arange(DECK_SIZE, dtype=np.int8), decks), (rounds, 1))
+    rows = np.arange(rounds)
+    dealt = np.zeros(rounds, dtype=np.intp)  # cards taken from the front of each shoe
+
+    def draw(idx):
+        # one Fisher-Yates step per table, so only dealt cards get shuffled
+        pos = dealt[idx]
+        pick = pos + (rng.random(len(idx)) * (size - pos)).astype(np.intp)
+        card = shoe[idx, pick]
+        shoe[idx, pick] = shoe[idx, pos]
+        dealt[idx] += 1
+        return card
+
+    # Starting Luck: each attempt looks at two distinct cards of the full
+    # shoe; a later attempt is kept only if strictly better
+    best = np.zeros(rounds, dtype=np.int16)
+    first = np.zeros(rounds, dtype=np.intp)
+    second = np.ones(rounds, dtype=np.intp)
+    for _ in range(1 + cards):
+        i = (rng.random(rounds) * size).astype(np.intp)
+        j = (rng.random(rounds) * (size - 1)).astype(np.intp)
+        j += j >= i
+        pair = np.stack([shoe[rows, i], shoe[rows, j]], axis=1)
+        value, _ = hand_totals(pair)
+        better = value > best
+        best[better] = value[better]
+        first[better] = i[better]
+        second[better] = j[better]
+    # move the kept pair to the front so later draws skip it
+    for slot, pos in ((0, first), (1, second)):
+        card = shoe[rows, pos]
+        shoe[rows, pos] = shoe[rows, slot]
+        shoe[rows, slot] = card
+        if slot == 0:
+            second = np.where(second == 0, first, second)
+    dealt[:] = 2
+
+    hard = HARD_LOOKUP[shoe[:, :2]].sum(axis=1, dtype=np.int16)
+    has_ace = ACE_LOOKUP[shoe[:, :2]].any(axis=1)
+    player, _ = _totals(hard, has_ace)
+    dealer = np.stack([draw(rows), draw(rows)], axis=1)
+    dealer_natural = hand_totals(dealer)[0] == 21
+    player_natural = player == 21
+    natural = player_natural | dealer_natural
+
+    active = ~natural & (player < threshold)
+    while active.any():
+        idx = rows[active]
+        card = draw(idx)
+        hard[idx] += HARD_LOOKUP[card]
+        has_ace[idx] |= ACE_LOOKUP[card]
+        player, _ = _totals(hard, has_ace)
+        active &= player < threshold
+
+    bust = player > 21
+    stood = rows[~natural & ~bust]
+    dealer_total, dealer_bust, _, _ = _playout(
+        dealer[stood], lambda idx, drawn: draw(stood[idx]), ai, nerves, rng)
+    p = player[stood]
+    won = dealer_bust | (p > dealer_total)
+    tied = ~dealer_bust & (p == dealer_total)
+
+    blackjack = int(np.count_nonzero(player_natural & ~dealer_natural))
+    win = int(np.count_nonzero(won))
+    push = int(np.count_nonzero(player_natural & dealer_natural)) + int(np.count_nonzero(tied))
+    lose = rounds - blackjack - win - push
+    gain = int(bet * (1 + payout * PAYOUT_STEP))
+    return {"win": win, "blackjack": blackjack, "push": push, "lose": lose,
+            "delta": blackjack * int(bet * 1.5) + win * gain - lose * bet}
@@ -0,0 +1,495 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from engine import (AI_DIFFICULTIES, Game, Shoe, card_to_tuple, card_value, create_deck, hand_value,
+                    starting_luck_hand)
+from profiler import PHASES, FrameProfiler
+from sessionstats import SessionStats
+from simulate import chunk_config, play_chunk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLD = 0.10  # compare mode flags anything this much slower than the baseline
+
+# Every benchmark returns {metric name: value}. All values are costs
+# (lower is better); the name's suffix gives the unit: _us, _ms, _pct or
+# _count. Results can be saved as a JSON baseline and compared later.
+
+
+def best_us(fn, number, repeat=5):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def subprocess_env():
+    return dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+                PYGAME_HIDE_SUPPORT_PROMPT="1")
+
+
+def run_snippet(code, *args):
+    out = subprocess.run([sys.executable, "-c", code, *map(str, args)], cwd=HERE,
+                         env=subprocess_env(), capture_output=True, text=True, check=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+# -------------------- STARTUP --------------------
+IMPORT_SNIPPET = (
+    "import time\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "print((time.perf_counter() - t) * 1000)\n"
+)
+
+FIRST_FRAME_SNIPPET = (
+    "import os\n"
+    "import sys\n"
+    "import time\n"
+    "import game\n"
+    "def presented(*args):\n"
+    "    print(time.time())\n"
+    "    sys.stdout.flush()\n"
+    "    os._exit(0)\n"
+    "game.pygame.display.flip = presented\n"
+    "game.pygame.display.update = presented\n"
+    "game.asset_cache_dir = {cache!r}\n"
+    "game.main()\n"
+)
+
+
+def import_time_ms(module, runs=5):
+    # fresh interpreter per run so nothing is already in sys.modules
+    return statistics.median(float(run_snippet(IMPORT_SNIPPET.format(module=module))) for _ in range(runs))
+
+
+def first_frame_ms(cache_dir=None, runs=5):
+    # wall time from launching the interpreter to the first presented frame
+    samples = []
+    for _ in range(runs):
+        start = time.time()
+        samples.append((float(run_snippet(FIRST_FRAME_SNIPPET.format(cache=cache_dir))) - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_startup():
+    results = {"startup.import_engine_ms": import_time_ms("engine"),
+               "startup.import_game_ms": import_time_ms("game"),
+               "startup.first_frame_ms": first_frame_ms()}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first_frame_ms(cache_dir, runs=1)  # fill the asset cache
+        results["startup.first_frame_asset_cache_ms"] = first_frame_ms(cache_dir)
+    return results
+
+
+# -------------------- ENGINE --------------------
+# the original string-tuple implementation, kept here as the baseline
+def legacy_card_value(card):
+    if card[0] in ['J', 'Q', 'K']:
+        return 10
+    if card[0] == 'A':
+        return 11
+    return int(card[0])
+
+
+def legacy_hand_value(hand):
+    value = sum(legacy_card_value(c) for c in hand)
+    aces = sum(1 for c in hand if c[0] == 'A')
+    while value > 21 and aces:
+        value -= 10
+        aces -= 1
+    return value
+
+
+# the original reroll: copy and reshuffle the whole deck for every attempt
+def legacy_starting_luck_hand(deck, attempts, rng=random):
+    best_hand = []
+    best_value = 0
+    for _ in range(attempts):
+        temp_deck = deck[:]
+        rng.shuffle(temp_deck)
+        test_hand = [temp_deck.pop(), temp_deck.pop()]
+        test_val = legacy_hand_value([card_to_tuple(c) for c in test_hand])
+        if test_val > best_value and test_val <= 21:
+            best_hand = test_hand
+            best_value = test_val
+    return best_hand
+
+
+def bench_cards(hands=10000):
+    rng = random.Random(0)
+    int_hands = [rng.sample(range(52), rng.randint(2, 5)) for _ in range(hands)]
+    tuple_hands = [[card_to_tuple(c) for c in h] for h in int_hands]
+    cards = list(range(52))
+
+    return {
+        "engine.card_value_us": best_us(lambda: [card_value(c) for c in cards], 2000) / 52,
+        "engine.hand_value_us": best_us(lambda: [hand_value(h) for h in int_hands], 1) / hands,
+        "engine.hand_value_legacy_tuple_us": best_us(lambda: [legacy_hand_value(h) for h in tuple_hands], 1) / hands,
+        "engine.create_deck_us": best_us(create_deck, 5000),
+    }
+
+
+def bench_starting_luck(deals=20000):
+    results = {}
+    for decks in (1, 6):
+        shoe = Shoe(decks)
+        for lvl in range(3):
+            attempts = 1 + lvl
+            results[f"engine.starting_luck.{decks}deck.lvl{lvl}_us"] = best_us(
+                lambda: starting_luck_hand(shoe.cards, attempts), deals, repeat=3)
+            results[f"engine.starting_luck_legacy.{decks}deck.lvl{lvl}_us"] = best_us(
+                lambda: legacy_starting_luck_hand(shoe.cards, attempts), deals // 10, repeat=3)
+    return results
+
+
+def bench_deal(deals=20000):
+    results = {}
+    for lvl in range(3):
+        g = Game(rng=random.Random(lvl))
+        g.upgrades["cards"]["lvl"] = lvl
+
+        def one_deal():
+            g.reset_round()
+            g.deal()
+
+        results[f"engine.deal.luck{lvl}_us"] = best_us(one_deal, deals, repeat=3)
+    return results
+
+
+def bench_finish_dealer(rounds=5000):
+    # only finish_dealer is timed; each call gets a freshly dealt round
+    results = {}
+    for ai in AI_DIFFICULTIES:
+        for nerves in range(4):
+            g = Game(rng=random.Random(nerves))
+            g.ai = ai
+            g.upgrades["nerves"]["lvl"] = nerves
+            best = float("inf")
+            for _ in range(3):
+                total = 0.0
+                for _ in range(rounds):
+                    g.reset_round()
+                    g.deal()
+                    start = time.perf_counter()
+                    g.finish_dealer()
+                    total += time.perf_counter() - start
+                best = min(best, total / rounds)
+            results[f"engine.finish_dealer.{ai.lower()}.nerves{nerves}_us"] = best * 1e6
+    return results
+
+
+def bench_rounds(rounds=20000):
+    config = chunk_config()
+    fast = chunk_config(fast=True)
+    return {
+        "engine.full_round_us": best_us(lambda: play_chunk((0, rounds, 1, config)), 1, repeat=3) / rounds,
+        "batch.full_round_us": best_us(lambda: play_chunk((0, 5 * rounds, 1, fast)), 1, repeat=3) / (5 * rounds),
+    }
+
+
+def bench_clone(calls=20000):
+    g = dealt_game()
+    snap = g.snapshot()
+    return {
+        "engine.clone_us": best_us(g.clone, calls),
+        "engine.snapshot_us": best_us(g.snapshot, calls),
+        "engine.restore_us": best_us(lambda: g.restore(snap), calls),
+        "engine.to_bytes_us": best_us(g.to_bytes, calls),
+    }
+
+
+def bench_session_stats(calls=20000):
+    # cost of recording one finished round, and of merging two collectors
+    g = dealt_game()
+    while not g.over:
+        g.stand()
+    stats, other = SessionStats(), SessionStats()
+    for _ in range(1000):
+        other.record(g)
+    return {
+        "sessionstats.record_us": best_us(lambda: stats.record(g), calls),
+        "sessionstats.merge_us": best_us(lambda: stats.merge(other), calls // 10),
+    }
+
+
+def chi2_critical(df, z=3.09):
+    # Wilson-Hilferty approximation of the chi-square quantile; z = 3.09
+    # is the one-sided 0.1% point of the normal distribution
+    return df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+
+
+def check_starting_luck_distribution(samples=200000, seed=1):
+    # The best starting value must be distributed the same way under both
+    # rerolls. A two-sample chi-square test per level fails at p < 0.001;
+    # the seed is fixed so the check gives the same answer on every run.
+    # Returns True if every level passes.
+    rng = random.Random(seed)
+    deck = list(range(52))
+    ok = True
+    for lvl in range(3):
+        old = [0] * 22
+        new = [0] * 22
+        for _ in range(samples):
+            old[hand_value(legacy_starting_luck_hand(deck, 1 + lvl, rng))] += 1
+            new[hand_value(starting_luck_hand(deck, 1 + lvl, rng))] += 1
+        tvd = sum(abs(a - b) for a, b in zip(old, new)) / (2 * samples)
+        bins = [(a, b) for a, b in zip(old, new) if a + b]
+        chi2 = sum((a - b) ** 2 / (a + b) for a, b in bins)
+        critical = chi2_critical(len(bins) - 1)
+        passed = chi2 <= critical
+        ok = ok and passed
+        print("starting luck lvl %d value distribution: TVD %.4f, chi2 %.1f (limit %.1f) %s"
+              % (lvl, tvd, chi2, critical, "ok" if passed else "FAIL"))
+    return ok
+
+
+# -------------------- RENDERER --------------------
+def load_game():
+    # the renderer needs a display; the dummy driver renders off-screen
+    for key, value in subprocess_env().items():
+        os.environ.setdefault(key, value)
+    import game
+    return game
+
+
+def dealt_game():
+    g = Game(rng=random.Random(1))
+    g.deal()
+    return g
+
+
+def draw_table_frame(game, g):
+    # what main() draws for a dealt hand: title, HUD, bet buttons, both card
+    # rows, totals and the action buttons
+    if not game.renderer.recording:
+        game.screen.blit(game.get_table_texture(), (0, 0))
+    title = game.render_text("BLACKJACK", game.GOLD, game.big_font)
+    game.blit(title, (258, 12))
+    game.blit(title, (260, 10))
+    game.blit(game.render_text(f"Money: ${g.money}", game.WHITE), (20, 80))
+    game.blit(game.render_text(f"Bet: ${g.bet}", game.WHITE), (20, 110))
+    game.blit(game.render_text(f"Upgrade Points: {g.up_points}", game.WHITE), (20, 140))
+    game.draw_button("+", 140, 105, 30, 30)
+    game.draw_button("-", 180, 105, 30, 30)
+    game.draw_button("ALL IN", 220, 105, 90, 30, game.RED)
+    for i, c in enumerate(g.dealer):
+        game.draw_card(c, 310 + i * 90, 180)
+    for i, c in enumerate(g.player):
+        game.draw_card(c, 310 + i * 90, 360)
+    game.blit(game.render_text(f"Dealer: {g.dealer.value}", game.WHITE), (50, 150))
+    game.blit(game.render_text(f"Player: {g.player.value}", game.WHITE), (50, 520))
+    game.draw_button("Hit", 280, 530, 100, 40)
+    game.draw_button("Stand", 420, 530, 100, 40)
+
+
+def bench_draw_calls(calls=2000):
+    game = load_game()
+    cache = game.surface_cache
+    game.get_card_atlas()
+    results = {
+        "render.draw_button_us": best_us(lambda: game.draw_button("Stand", 420, 530, 100, 40), calls),
+        "render.build_button_us": best_us(lambda: game.build_button("Stand", 100, 40, game.GRAY), calls // 10),
+        "render.draw_card_us": best_us(lambda: game.draw_card(51, 310, 180), calls),
+        "render.draw_card_flip_us": best_us(lambda: game.draw_card(51, 310, 180, 0.5), calls),
+        "render.build_card_face_us": best_us(lambda: game.build_card_face(51, 80, 120), calls // 10),
+    }
+
+    g = dealt_game()
+    for label, maxsize in (("uncached", 0), ("cached", 512)):
+        cache.maxsize = maxsize
+        cache.items.clear()
+        cache.reset_stats()
+        frames = 300
+        results[f"render.table_frame_{label}_us"] = best_us(lambda: draw_table_frame(game, g), frames, repeat=1)
+        results[f"render.table_frame_{label}_surfaces_built_count"] = cache.misses / frames
+    results["render.table_frame_cached_miss_pct"] = (1 - cache.hit_rate()) * 100
+    cache.maxsize = 512
+    return results
+
+
+def bench_dirty_rects(frames=300):
+    game = load_game()
+    pygame = game.pygame
+    g = dealt_game()
+
+    def full():
+        draw_table_frame(game, g)
+        pygame.display.flip()
+
+    def dirty(step):
+        # every 30th frame the money changes, like after a click
+        if step % 30 == 0:
+            g.money += 10
+        draw_table_frame(game, g)
+        return game.renderer.present()
+
+    results = {"render.full_frame_flip_us": best_us(full, frames, repeat=1)}
+
+    game.renderer.recording = True
+    game.renderer.invalidate()
+    start = timeit.default_timer()
+    area = sum(r.w * r.h for step in range(frames) for r in dirty(step))
+    results["render.dirty_frame_us"] = (timeit.default_timer() - start) / frames * 1e6
+    game.renderer.recording = False
+
+    screen_area = game.SCREEN_WIDTH * game.SCREEN_HEIGHT
+    results["render.dirty_frame_screen_pushed_pct"] = area / frames / screen_area * 100
+    return results
+
+
+# a whole main() run under the dummy driver, timed by its own profiler
+MAIN_FRAME_SNIPPET = (
+    "import json\n"
+    "import sys\n"
+    "import game\n"
+    "pygame = game.pygame\n"
+    "path, deal = sys.argv[1], sys.argv[2] == '1'\n"
+    "if deal:\n"
+    "    click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(200, 290), button=1)\n"
+    "    pygame.time.set_timer(click, 200, loops=1)\n"
+    "pygame.time.set_timer(pygame.QUIT, 1500, loops=1)\n"
+    "game.main(profile=path)\n"
+    "print(json.load(open(path))['summary']['frame']['p50_ms'])\n"
+)
+
+
+def bench_main_frame():
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "frames.json")
+        for label, deal in (("betting", 0), ("dealt", 1)):
+            results[f"render.main_frame_{label}_ms"] = float(run_snippet(MAIN_FRAME_SNIPPET, path, deal))
+    return results
+
+
+IDLE_SNIPPET = (
+    "import time\n"
+    "import game\n"
+    "game.pygame.time.set_timer(game.pygame.QUIT, {ms}, loops=1)\n"
+    "t = time.process_time()\n"
+    "game.main(dirty={dirty}, adaptive={adaptive})\n"
+    "print(time.process_time() - t)\n"
+)
+
+
+def idle_cpu_percent(seconds=3, dirty=False, adaptive=False):
+    # CPU used by main() sitting on the betting screen with no input
+    code = IDLE_SNIPPET.format(ms=seconds * 1000, dirty=dirty, adaptive=adaptive)
+    return float(run_snippet(code)) / seconds * 100
+
+
+def bench_idle_cpu():
+    return {
+        "idle.cpu_pct": idle_cpu_percent(),
+        "idle.cpu_adaptive_pct": idle_cpu_percent(adaptive=True),
+        "idle.cpu_adaptive_dirty_pct": idle_cpu_percent(dirty=True, adaptive=True),
+    }
+
+
+def bench_profiler_overhead(frames=100000):
+    def frame(prof):
+        prof.begin_frame()
+        for name in PHASES:
+            prof.mark(name)
+        prof.end_frame()
+
+    off, on = FrameProfiler(enabled=False), FrameProfiler(enabled=True, keep_history=True)
+    return {"profiler.off_us": best_us(lambda: frame(off), frames, repeat=3),
+            "profiler.on_us": best_us(lambda: frame(on), frames, repeat=3)}
+
+
+BENCHMARKS = [
+    ("startup", bench_startup),
+    ("cards", bench_cards),
+    ("starting_luck", bench_starting_luck),
+    ("deal", bench_deal),
+    ("finish_dealer", bench_finish_dealer),
+    ("rounds", bench_rounds),
+    ("clone", bench_clone),
+    ("session_stats", bench_session_stats),
+    ("draw_calls", bench_draw_calls),
+    ("dirty_rects", bench_dirty_rects),
+    ("main_frame", bench_main_frame),
+    ("idle_cpu", bench_idle_cpu),
+    ("profiler", bench_profiler_overhead),
+]
+
+
+# -------------------- BASELINES --------------------
+def run_benchmarks(only=None):
+    results = {}
+    for name, bench in BENCHMARKS:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        for metric, value in bench().items():
+            results[metric] = value
+            print(f"{metric:<50} {value:12.3f}")
+    return results
+
+
+def save_baseline(path, results):
+    data = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # returns the metrics that got slower than the baseline by more than threshold
+    regressions = []
+    print(f"\n{'metric':<50} {'baseline':>12} {'now':>12} {'change':>8}")
+    for metric, value in results.items():
+        old = baseline.get(metric)
+        if old is None:
+            continue
+        change = (value - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(metric)
+        print(f"{metric:<50} {old:12.3f} {value:12.3f} {change:+8.1%}{flag}")
+    return regressions
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BlackJack engine and renderer benchmarks.")
+    parser.add_argument("-k", dest="only", action="append",
+                        help="only run benchmark groups whose name contains this (repeatable)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--checks", action="store_true",
+                        help="also run the Starting Luck distribution check")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only)
+    failed = args.checks and not check_starting_luck_distribution()
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    if failed:
+        print("\ndistribution check failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
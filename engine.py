@@ -0,0 +1,790 @@
+import random
+import struct
+from operator import attrgetter
+
+# -------------------- RULES CONFIG --------------------
+AI_DIFFICULTIES = ["Easy", "Normal", "Hard"]
+
+# dealer draws until reaching this total; Dealer Nerves adds its level on top
+DEALER_THRESHOLDS = {"Easy": 15, "Normal": 17, "Hard": 19}
+# chance per Dealer Nerves level that the dealer burns one of their cards
+NERVES_BURN_CHANCE = {0: 0, 1: 0.3, 2: 0.6, 3: 0.9}
+# each Bonus Payout level adds this much to the win multiplier
+PAYOUT_STEP = 0.25
+# seconds between pulling the trigger and revealing the chamber
+ROULETTE_REVEAL_DELAY = 1.2
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+
+# -------------------- CARD ENCODING --------------------
+# A card is an int 0-51: suit index * 13 + rank index into RANKS.
+# Values are looked up in tables built once here, so the hot paths never
+# touch strings.
+DECK_SIZE = len(SUITS) * len(RANKS)
+ACE = RANKS.index('A')
+
+RANK_VALUES = tuple(11 if r == 'A' else 10 if r in ['J', 'Q', 'K'] else int(r) for r in RANKS)
+CARD_VALUES = tuple(RANK_VALUES[c % 13] for c in range(DECK_SIZE))
+HARD_VALUES = tuple(1 if c % 13 == ACE else CARD_VALUES[c] for c in range(DECK_SIZE))  # aces as 1
+IS_ACE = tuple(c % 13 == ACE for c in range(DECK_SIZE))
+
+
+# conversion layer for the renderer and anything that prints cards
+def card_rank(card):
+    return RANKS[card % 13]
+
+
+def card_suit(card):
+    return SUITS[card // 13]
+
+
+def card_to_tuple(card):
+    return (RANKS[card % 13], SUITS[card // 13])
+
+
+def card_from_tuple(card):
+    rank, suit = card
+    return SUITS.index(suit) * 13 + RANKS.index(rank)
+
+
+# -------------------- UTILITY FUNCTIONS --------------------
+def create_deck(rng=random):
+    deck = list(range(DECK_SIZE))
+    rng.shuffle(deck)
+    return deck
+
+
+def card_value(card):
+    return CARD_VALUES[card]
+
+
+def hand_total(hard, has_ace):
+    # a hand's value from its hard total; at most one ace can count as 11
+    return hard + 10 if has_ace and hard <= 11 else hard
+
+
+def hand_value(hand):
+    value = 0
+    soft = False
+    for c in hand:
+        value += HARD_VALUES[c]
+        soft = soft or IS_ACE[c]
+    return hand_total(value, soft)
+
+
+def starting_luck_hand(cards, attempts, rng=random):
+    # Each attempt looks at two distinct random cards of the live deck, which
+    # is the same as popping two cards off a shuffled copy of it, without
+    # the copy. Keep the hand if it's better than current best but not bust.
+    n = len(cards)
+    best_hand = []
+    best_value = 0
+    for _ in range(attempts):
+        i = rng.randrange(n)
+        j = rng.randrange(n - 1)
+        if j >= i:
+            j += 1
+        test_hand = [cards[i], cards[j]]
+        test_val = hand_value(test_hand)
+        if test_val > best_value and test_val <= 21:
+            best_hand = test_hand
+            best_value = test_val
+    return best_hand
+
+
+# -------------------- HAND --------------------
+class Hand(list):
+    # A list of cards that keeps its blackjack value up to date as cards are
+    # added and removed, so reading it is a field access instead of a rescan.
+    # hard: total with every ace counted as 1; aces: how many aces are held.
+    __slots__ = ("hard", "aces", "value", "soft")
+
+    def __init__(self, cards=()):
+        super().__init__(cards)
+        self._recount()
+
+    def _recount(self):
+        self.hard = sum(HARD_VALUES[c] for c in self)
+        self.aces = sum(1 for c in self if IS_ACE[c])
+        self._update()
+
+    def _update(self):
+        # hand_total's rule, inlined since this runs on every card
+        self.soft = self.aces > 0 and self.hard <= 11
+        self.value = self.hard + 10 if self.soft else self.hard
+
+    def _add(self, card):
+        self.hard += HARD_VALUES[card]
+        self.aces += IS_ACE[card]
+
+    def _sub(self, card):
+        self.hard -= HARD_VALUES[card]
+        self.aces -= IS_ACE[card]
+
+    def append(self, card):
+        super().append(card)
+        self._add(card)
+        self._update()
+
+    def insert(self, index, card):
+        super().insert(index, card)
+        self._add(card)
+        self._update()
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def remove(self, card):
+        super().remove(card)
+        self._sub(card)
+        self._update()
+
+    def pop(self, index=-1):
+        card = super().pop(index)
+        self._sub(card)
+        self._update()
+        return card
+
+    def clear(self):
+        super().clear()
+        self.hard = 0
+        self.aces = 0
+        self._update()
+
+    # the rest of list's in-place mutators are rare; recount after them
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._recount()
+        return self
+
+    def __setitem__(self, index, cards):
+        super().__setitem__(index, cards)
+        self._recount()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._recount()
+
+    def copy(self):
+        # a Hand again, with the totals carried over instead of recounted
+        h = _new_hand(Hand)
+        _extend(h, self)
+        h.hard = self.hard
+        h.aces = self.aces
+        h.value = self.value
+        h.soft = self.soft
+        return h
+
+
+_new_hand = Hand.__new__
+_new_object = object.__new__
+_extend = list.extend
+
+
+# -------------------- SHOE --------------------
+class Shoe:
+    # 1-8 decks shuffled together that last across rounds. The shoe is only
+    # reshuffled once the cut card is reached (penetration = fraction dealt).
+    # cards holds what is left; where[card] lists the indexes in cards that
+    # hold a copy of card, so a specific card can be found and removed
+    # without scanning. Copies leave where to be rebuilt on first use, so
+    # look-ahead that only ever pops never pays for it.
+    __slots__ = ("decks", "penetration", "rng", "size", "cards", "where")
+
+    def __init__(self, decks=1, penetration=0.75, rng=random):
+        if not 1 <= decks <= 8:
+            raise ValueError("a shoe holds between 1 and 8 decks")
+        if not 0 <= penetration <= 1:
+            raise ValueError("penetration must be between 0 and 1")
+        self.decks = decks
+        self.penetration = penetration
+        self.rng = rng
+        self.size = decks * DECK_SIZE
+        self.shuffle()
+
+    def shuffle(self):
+        self.cards = list(range(DECK_SIZE)) * self.decks
+        self.rng.shuffle(self.cards)
+        self._index()
+
+    def _index(self):
+        self.where = [[] for _ in range(DECK_SIZE)]
+        for i, card in enumerate(self.cards):
+            self.where[card].append(i)
+        return self.where
+
+    def copy(self, rng=None):
+        shoe = _new_object(Shoe)
+        shoe.decks = self.decks
+        shoe.penetration = self.penetration
+        shoe.rng = self.rng if rng is None else rng
+        shoe.size = self.size
+        shoe.cards = self.cards[:]
+        shoe.where = None
+        return shoe
+
+    def needs_shuffle(self):
+        return len(self.cards) <= self.size * (1 - self.penetration)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __contains__(self, card):
+        return bool((self.where or self._index())[card])
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def pop(self):
+        if not self.cards:
+            # past the cut card mid-round; start a fresh shoe
+            self.shuffle()
+        card = self.cards.pop()
+        if self.where is not None:
+            self.where[card].remove(len(self.cards))
+        return card
+
+    def remove(self, card):
+        # swap the card with the last one, then pop; the order of a shuffled
+        # shoe stays uniformly random
+        where = self.where or self._index()
+        spots = where[card]
+        if not spots:
+            raise ValueError(f"card {card} is not in the shoe")
+        i = spots.pop()
+        last = self.cards.pop()
+        if i < len(self.cards):
+            self.cards[i] = last
+            moved = self.where[last]
+            moved[moved.index(len(self.cards))] = i
+
+
+# -------------------- GAME CLASS --------------------
+# Game attributes are split in two. Rules state decides what happens next
+# and is what snapshot(), clone() and to_bytes() carry. UI state only
+# drives the window's animations and popups; copies start it fresh.
+RULES_FIELDS = ("money", "bet", "wins", "up_points", "roulette", "ai", "dealt", "turn", "over",
+                "msg", "outcome", "start_money", "stood", "burned", "rr_running", "rr_result",
+                "rr_chamber", "rr_multiplier", "rr_streak")
+UI_FIELDS = ("ai_open", "lost_screen", "flipping", "flip_progress", "rr_anim", "burn_popup", "burn_timer")
+UPGRADE_KEYS = ("cards", "nerves", "payout")
+
+_rules_state = attrgetter(*RULES_FIELDS)
+
+# to_bytes() layout: the fixed fields below, then the player's, dealer's
+# and shoe's cards one byte each, then msg as UTF-8. None is stored as 255.
+SAVE_MAGIC = b"BJGS"
+SAVE_VERSION = 1
+SAVE_HEADER = struct.Struct("<4sB qqqqqq BBBBBBBBB BBB BBB Bd BBHH")
+NONE_BYTE = 255
+OUTCOME_CODES = ("win", "blackjack", "push", "lose")
+RR_RESULT_CODES = (False, True)
+
+
+def _code(value, values):
+    return NONE_BYTE if value is None else values.index(value)
+
+
+def _decode(code, values):
+    return None if code == NONE_BYTE else values[code]
+
+
+class Game:
+    # rng is anything with the random module's API (e.g. random.Random(seed));
+    # all of the game's randomness goes through it
+    __slots__ = RULES_FIELDS + UI_FIELDS + ("rng", "deck", "upgrades", "player", "dealer")
+
+    def __init__(self, decks=1, penetration=0.75, rng=random):
+        self.rng = rng
+        self.deck = Shoe(decks, penetration, rng)
+        self.money = 1500
+        self.bet = 100
+        self.wins = 0
+        self.up_points = 0
+
+        # mode toggles
+        self.roulette = False
+        self.ai = "Normal"
+        self.ai_open = False
+
+        # upgrade system
+        self.upgrades = {
+            "cards": {"lvl": 0, "max": 2},
+            "nerves": {"lvl": 0, "max": 3},
+            "payout": {"lvl": 0, "max": 3},
+        }
+
+        # round state
+        self.reset_round()
+        self.lost_screen = False
+        self.flipping = False
+        self.flip_progress = 0
+
+        # ---------------- RUSSIAN ROULETTE STATE ----------------
+        self.rr_running = False
+        self.rr_anim = 0
+        self.rr_result = None
+
+        self.rr_multiplier = 1
+        self.rr_streak = 0
+
+    def reset_round(self):
+        if self.deck.needs_shuffle():
+            self.deck.shuffle()
+        self.player = Hand()
+        self.dealer = Hand()
+        self.dealt = False
+        self.turn = True
+        self.over = False
+        self.msg = ""
+        self.outcome = None  # "win", "blackjack", "push" or "lose" once the round is over
+        self.start_money = self.money  # money before the round, set again by deal()
+        self.stood = False
+        self.burned = None  # the card Dealer Nerves burned this round
+        self.rr_chamber = 0  # 1-6 once the trigger has been pulled
+        self.bet = max(10, min(self.bet, self.money))
+        self.lost_screen = False
+        self.flipping = False
+        self.flip_progress = 0
+        self.burn_popup = ""  # last round's popup would keep --adaptive awake
+        self.burn_timer = 0
+
+        # reset roulette state
+        self.rr_running = False
+        self.rr_anim = 0
+        self.rr_result = None
+
+    # ---------------- SNAPSHOTS ----------------
+    # For look-ahead: snap = g.snapshot(); g.hit(); ...; g.restore(snap).
+    # The RNG is shared, not saved; give clone() its own rng for rollouts
+    # that must not disturb the original game's sequence.
+    def snapshot(self):
+        up = self.upgrades
+        return (_rules_state(self), self.player.copy(), self.dealer.copy(), tuple(self.deck.cards),
+                up["cards"]["lvl"], up["nerves"]["lvl"], up["payout"]["lvl"])
+
+    def restore(self, snap):
+        state, player, dealer, cards, cards_lvl, nerves_lvl, payout_lvl = snap
+        (self.money, self.bet, self.wins, self.up_points, self.roulette, self.ai, self.dealt,
+         self.turn, self.over, self.msg, self.outcome, self.start_money, self.stood, self.burned,
+         self.rr_running, self.rr_result, self.rr_chamber, self.rr_multiplier, self.rr_streak) = state
+        self.player = player.copy()
+        self.dealer = dealer.copy()
+        self.deck.cards = list(cards)
+        self.deck.where = None
+        up = self.upgrades
+        up["cards"]["lvl"] = cards_lvl
+        up["nerves"]["lvl"] = nerves_lvl
+        up["payout"]["lvl"] = payout_lvl
+
+    def clone(self, rng=None):
+        g = _new_object(type(self))
+        (g.money, g.bet, g.wins, g.up_points, g.roulette, g.ai, g.dealt,
+         g.turn, g.over, g.msg, g.outcome, g.start_money, g.stood, g.burned,
+         g.rr_running, g.rr_result, g.rr_chamber, g.rr_multiplier, g.rr_streak) = _rules_state(self)
+        g.rng = self.rng if rng is None else rng
+        g.deck = self.deck.copy(g.rng)
+        g.player = self.player.copy()
+        g.dealer = self.dealer.copy()
+        up = self.upgrades
+        g.upgrades = {
+            "cards": {"lvl": up["cards"]["lvl"], "max": 2},
+            "nerves": {"lvl": up["nerves"]["lvl"], "max": 3},
+            "payout": {"lvl": up["payout"]["lvl"], "max": 3},
+        }
+        g.ai_open = g.lost_screen = g.flipping = False
+        g.flip_progress = g.rr_anim = g.burn_timer = 0
+        g.burn_popup = ""
+        return g
+
+    def to_bytes(self):
+        msg = self.msg.encode()
+        header = SAVE_HEADER.pack(
+            SAVE_MAGIC, SAVE_VERSION,
+            self.money, self.bet, self.wins, self.up_points, self.start_money, self.rr_multiplier,
+            AI_DIFFICULTIES.index(self.ai), self.roulette, self.dealt, self.turn, self.over,
+            self.stood, self.rr_running, _code(self.rr_result, RR_RESULT_CODES), self.rr_chamber,
+            _code(self.outcome, OUTCOME_CODES), _code(self.burned, range(DECK_SIZE)), self.rr_streak,
+            *(self.upgrades[k]["lvl"] for k in UPGRADE_KEYS),
+            self.deck.decks, self.deck.penetration,
+            len(self.player), len(self.dealer), len(self.deck.cards), len(msg))
+        return header + bytes(self.player) + bytes(self.dealer) + bytes(self.deck.cards) + msg
+
+    @classmethod
+    def from_bytes(cls, data, rng=random):
+        (magic, version, money, bet, wins, up_points, start_money, rr_multiplier,
+         ai, roulette, dealt, turn, over, stood, rr_running, rr_result, rr_chamber,
+         outcome, burned, rr_streak, cards_lvl, nerves_lvl, payout_lvl, decks, penetration,
+         n_player, n_dealer, n_cards, n_msg) = SAVE_HEADER.unpack_from(data)
+        if magic != SAVE_MAGIC or version != SAVE_VERSION:
+            raise ValueError("not a saved game")
+
+        g = cls(decks, penetration, rng)
+        g.money, g.bet, g.wins, g.up_points = money, bet, wins, up_points
+        g.start_money, g.rr_multiplier, g.rr_streak = start_money, rr_multiplier, rr_streak
+        g.ai = AI_DIFFICULTIES[ai]
+        g.roulette, g.dealt, g.turn, g.over = bool(roulette), bool(dealt), bool(turn), bool(over)
+        g.stood, g.rr_running, g.rr_chamber = bool(stood), bool(rr_running), rr_chamber
+        g.rr_result = _decode(rr_result, RR_RESULT_CODES)
+        g.outcome = _decode(outcome, OUTCOME_CODES)
+        g.burned = _decode(burned, range(DECK_SIZE))
+        for key, lvl in zip(UPGRADE_KEYS, (cards_lvl, nerves_lvl, payout_lvl)):
+            g.upgrades[key]["lvl"] = lvl
+
+        pos = SAVE_HEADER.size
+        g.player = Hand(data[pos:pos + n_player])
+        pos += n_player
+        g.dealer = Hand(data[pos:pos + n_dealer])
+        pos += n_dealer
+        g.deck.cards = list(data[pos:pos + n_cards])
+        g.deck.where = None
+        pos += n_cards
+        g.msg = data[pos:pos + n_msg].decode()
+        return g
+
+    # ---------------- RUSSIAN ROULETTE ----------------
+    def play_russian_roulette(self):
+        self.rr_running = True
+        self.rr_anim = 0
+        self.rr_result = None
+
+        # 1 bullet in 6 chambers
+        chamber = self.rng.randint(1, 6)
+        self.rr_chamber = chamber
+
+        # store result; the front end delays the reveal for its animation
+        # and then calls resolve_russian_roulette()
+        self.rr_result = (chamber == 1)
+
+    def resolve_russian_roulette(self):
+        if not self.rr_running:
+            return
+
+        if self.rr_result:  # player died
+            self.msg = "💥 BANG! You died!"
+            self.money = 0
+            self.rr_multiplier = 1
+            self.rr_streak = 0
+            self.outcome = "lose"
+
+        else:  # survived
+            self.rr_streak += 1
+            self.rr_multiplier = 2 ** self.rr_streak
+            winnings = 1000000 * self.rr_multiplier
+
+            self.msg = f"Click... You survived! +${winnings:,} (x{self.rr_multiplier})"
+            self.money += winnings
+            self.outcome = "win"
+
+        self.over = True
+        self.rr_running = False
+
+    # ---------------- UPGRADES ----------------
+    def buy_upgrade(self, key):
+        u = self.upgrades[key]
+        if self.up_points > 0 and u["lvl"] < u["max"]:
+            u["lvl"] += 1
+            self.up_points -= 1
+            return True
+        return False
+
+    # ---------------- NORMAL BLACKJACK ----------------
+    def deal(self):
+        self.start_money = self.money
+        if self.roulette:
+            self.play_russian_roulette()
+            self.dealt = True
+            return
+        # Reworked Extra Cards: Instead of more cards, we "re-roll" the start
+        # Level 0: 1 attempt, Level 1: 2 attempts, Level 2: 3 attempts
+        attempts = 1 + self.upgrades["cards"]["lvl"]
+        if len(self.deck) < 4:  # two cards each for player and dealer
+            self.deck.shuffle()
+        best_hand = starting_luck_hand(self.deck.cards, attempts, self.rng)
+
+        # Apply the best hand found and remove those specific cards from the actual deck
+        self.player = Hand(best_hand)
+        for card in self.player:
+            if card in self.deck:
+                self.deck.remove(card)
+
+        self.dealer = Hand([self.deck.pop(), self.deck.pop()])
+        self.dealt = True
+        self.flipping = True
+        self.flip_progress = 0
+
+        p = self.player.value
+        d = self.dealer.value
+
+        if p == 21 and d == 21:
+            self.msg = "Both have Blackjack! PUSH"
+            self.outcome = "push"
+            self.over = True
+        elif p == 21:
+            self.msg = "Blackjack! You win!"
+            self.money += int(self.bet * 1.5)
+            self.outcome = "blackjack"
+            self.over = True
+        elif d == 21:
+            self.msg = "Dealer has Blackjack!"
+            self.money = max(0, self.money - self.bet)
+            self.outcome = "lose"
+            self.over = True
+
+    def hit(self):
+        if self.roulette:
+            return
+        self.player.append(self.deck.pop())
+        if self.player.value > 21:
+            self.lose()
+
+    def stand(self):
+        if self.roulette:
+            return
+        self.stood = True
+        self.finish_dealer()
+        p, d = self.player.value, self.dealer.value
+
+        if d > 21 or p > d:
+            self.win()
+        elif p < d:
+            self.lose()
+        else:
+            if self.msg == "":
+                self.msg = "Push"
+            self.outcome = "push"
+            self.over = True
+
+    def finish_dealer(self):
+        if self.roulette:
+            return
+
+        nerves_level = self.upgrades["nerves"]["lvl"]
+        nerves_chance = NERVES_BURN_CHANCE[nerves_level]
+
+        # dealer stress mechanic
+        if nerves_chance > 0 and len(self.dealer) > 1 and self.rng.random() < nerves_chance:
+            burned_card = self.rng.choice(self.dealer[1:])
+            self.dealer.remove(burned_card)
+            self.burned = burned_card
+
+            #  popup indicator
+            self.burn_popup = f"Dealer burned {card_rank(burned_card)}!"
+            self.burn_timer = 1.0  # seconds the popup stays up
+
+            # keep original message (optional)
+            self.msg = f"Dealer stressed out! Card {card_rank(burned_card)} burned 🔥"
+
+        base = DEALER_THRESHOLDS[self.ai]
+        base += nerves_level
+
+        while self.dealer.value < base:
+            self.dealer.append(self.deck.pop())
+
+    def win(self):
+        if self.roulette:
+            self.money += 1000000
+            self.msg = "Click... You survived! +$1,000,000"
+            self.over = True
+            return
+
+        mult = 1 + self.upgrades["payout"]["lvl"] * PAYOUT_STEP
+        gain = int(self.bet * mult)
+        self.money += gain
+        self.wins += 1
+
+        if self.wins % 2 == 0:
+            self.up_points += 1
+
+        self.msg = f"Win +${gain}"
+        self.outcome = "win"
+        self.over = True
+
+    def lose(self):
+        if self.roulette:
+            self.msg = "💥 BANG! You died!"
+            self.money = 0
+            self.over = True
+            return
+
+        self.money = max(0, self.money - self.bet)
+        self.msg = f"You lost -${self.bet}"
+        self.outcome = "lose"
+        self.over = True
+
+
+# -------------------- MULTI-SEAT TABLE --------------------
+MAX_SEATS = 7
+CARDS_PER_HAND = 5  # a round's usual draw per seat and for the dealer, hits included
+
+# Table.to_bytes() layout: this header (an outcome code per seat, unused
+# seats NONE_BYTE), each seat's card count and cards, then the Game bytes
+TABLE_MAGIC = b"BJTB"
+TABLE_HEADER = struct.Struct(f"<4sBBB{MAX_SEATS}B")
+
+
+class Table(Game):
+    # A Game where the player plays up to MAX_SEATS hands ("seats") at once,
+    # each for the full bet, against one dealer hand from one shoe. Seats
+    # act in order; player is the seat whose turn it is, so hit(), stand()
+    # and simulate.py policies work on it unchanged. The dealer plays out
+    # once, after the last seat, and every seat is then settled against
+    # the dealer's final total in a single pass. snapshot(), clone() and
+    # to_bytes() carry the seats.
+    __slots__ = ("seats", "hands", "active", "outcomes")
+
+    def __init__(self, seats=2, decks=1, penetration=0.75, rng=random):
+        if not 1 <= seats <= MAX_SEATS:
+            raise ValueError(f"a table has between 1 and {MAX_SEATS} seats")
+        self.seats = seats
+        super().__init__(decks, penetration, rng)
+
+    def reset_round(self):
+        super().reset_round()
+        self.hands = [Hand() for _ in range(self.seats)]
+        self.outcomes = [None] * self.seats  # per seat, like Game.outcome
+        self.active = 0
+        self.player = self.hands[0]
+
+    def deal(self):
+        if self.roulette:
+            super().deal()
+            return
+        self.start_money = self.money
+        self.bet = max(10, min(self.bet, self.money // self.seats))
+        attempts = 1 + self.upgrades["cards"]["lvl"]
+        # reshuffle up front rather than have Shoe.pop start a fresh shoe
+        # mid-round, which would hold cards that are already on the table
+        if len(self.deck) < CARDS_PER_HAND * (self.seats + 1):
+            self.deck.shuffle()
+        for i in range(self.seats):
+            hand = Hand(starting_luck_hand(self.deck.cards, attempts, self.rng))
+            for card in hand:
+                self.deck.remove(card)
+            self.hands[i] = hand
+        self.player = self.hands[0]  # also when the round ends right here
+        self.dealer = Hand([self.deck.pop(), self.deck.pop()])
+        self.dealt = True
+        self.flipping = True
+        self.flip_progress = 0
+
+        dealer_blackjack = self.dealer.value == 21
+        for i, hand in enumerate(self.hands):
+            if hand.value == 21:
+                self.outcomes[i] = "push" if dealer_blackjack else "blackjack"
+            elif dealer_blackjack:
+                self.outcomes[i] = "lose"
+        if dealer_blackjack:
+            self.msg = "Dealer has Blackjack!"
+        self._next_seat(0)
+
+    def hit(self):
+        if self.roulette:
+            return
+        self.player.append(self.deck.pop())
+        if self.player.value > 21:
+            self.outcomes[self.active] = "lose"
+            self._next_seat(self.active + 1)
+
+    def stand(self):
+        if self.roulette:
+            return
+        self.stood = True
+        self._next_seat(self.active + 1)
+
+    def _next_seat(self, i):
+        # move the turn to the next seat still to act, or finish the round
+        while i < self.seats and self.outcomes[i] is not None:
+            i += 1
+        if i < self.seats:
+            self.active = i
+            self.player = self.hands[i]
+            return
+        if self.stood:
+            self.finish_dealer()
+        self.settle()
+
+    def settle(self):
+        # one pass over the seats against the dealer's final total
+        d = self.dealer.value
+        dealer_bust = d > 21
+        bet = self.bet
+        gain = int(bet * (1 + self.upgrades["payout"]["lvl"] * PAYOUT_STEP))
+        payoff = {"blackjack": int(bet * 1.5), "win": gain, "push": 0, "lose": -bet}
+        outcomes = self.outcomes
+        for i, hand in enumerate(self.hands):
+            if outcomes[i] is None:
+                p = hand.value
+                outcomes[i] = "win" if dealer_bust or p > d else "lose" if p < d else "push"
+
+        delta = sum(payoff[o] for o in outcomes)
+        for o in outcomes:
+            if o == "win":
+                self.wins += 1
+                if self.wins % 2 == 0:
+                    self.up_points += 1
+        self.money = max(0, self.money + delta)
+        if len(set(outcomes)) == 1:
+            self.outcome = outcomes[0]
+        else:
+            self.outcome = "win" if delta > 0 else "lose" if delta < 0 else "push"
+        self.msg = f"{outcomes.count('win') + outcomes.count('blackjack')} of {self.seats} won: "
+        self.msg += f"+${delta}" if delta >= 0 else f"-${-delta}"
+        self.over = True
+
+    # ---------------- SNAPSHOTS ----------------
+    def snapshot(self):
+        return (super().snapshot(), tuple(h.copy() for h in self.hands), self.active, tuple(self.outcomes))
+
+    def restore(self, snap):
+        base, hands, active, outcomes = snap
+        super().restore(base)
+        self.hands = [h.copy() for h in hands]
+        self.active = active
+        self.outcomes = list(outcomes)
+        self.player = self.hands[active]
+
+    def clone(self, rng=None):
+        g = super().clone(rng)
+        g.seats = self.seats
+        g.hands = [h.copy() for h in self.hands]
+        g.active = self.active
+        g.outcomes = self.outcomes[:]
+        g.player = g.hands[g.active]
+        return g
+
+    def to_bytes(self):
+        outcomes = [_code(o, OUTCOME_CODES) for o in self.outcomes]
+        outcomes += [NONE_BYTE] * (MAX_SEATS - self.seats)
+        header = TABLE_HEADER.pack(TABLE_MAGIC, SAVE_VERSION, self.seats, self.active, *outcomes)
+        hands = b"".join(bytes([len(h)]) + bytes(h) for h in self.hands)
+        return header + hands + super().to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data, rng=random):
+        magic, version, seats, active, *outcomes = TABLE_HEADER.unpack_from(data)
+        if magic != TABLE_MAGIC or version != SAVE_VERSION:
+            raise ValueError("not a saved table")
+        pos = TABLE_HEADER.size
+        hands = []
+        for _ in range(seats):
+            n = data[pos]
+            hands.append(Hand(data[pos + 1:pos + 1 + n]))
+            pos += 1 + n
+
+        # the shared state loads as a plain Game, then moves to the table
+        game = Game.from_bytes(data[pos:], rng)
+        g = cls(seats, game.deck.decks, game.deck.penetration, rng)
+        Game.restore(g, game.snapshot())
+        g.hands = hands
+        g.active = active
+        g.outcomes = [_decode(code, OUTCOME_CODES) for code in outcomes[:seats]]
+        g.player = hands[active]
+        return g
@@ -1,7 +1,13 @@
 import pygame
-import random
+import argparse
 import math
+import os
 import time
+from collections import OrderedDict
+
+from engine import AI_DIFFICULTIES, MAX_SEATS, ROULETTE_REVEAL_DELAY, Game, Table, card_rank, card_suit
+from profiler import PHASES, FrameProfiler
+from sessionstats import SessionStats, print_summary
 
 pygame.init()
 
@@ -9,6 +15,15 @@ pygame.init()
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
+FPS = 60
+IDLE_FPS = 10  # adaptive mode: frame rate while nothing on screen is moving
+MAX_FRAME_DT = 0.1  # seconds; keeps animations from jumping after a stall
+
+# animation speeds, per second
+FLIP_SPEED = 4.8
+RR_SPIN_SPEED = 12
+GAME_OVER_PULSE_SPEED = 4.8
+
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (200, 40, 40)
@@ -18,65 +33,123 @@ GRAY = (70, 70, 70)
 DARK = (40, 40, 40)
 BLUE = (0, 0, 128)
 
-AI_DIFFICULTIES = ["Easy", "Normal", "Hard"]
-
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 
 pygame.display.set_caption("BlackJack")
 
 font = pygame.font.Font(None, 28)
 big_font = pygame.font.Font(None, 80)
+small_font = pygame.font.Font(None, 20)
+
+# -------------------- STARTUP ASSETS --------------------
+# Background and overlay surfaces are built the first time they are drawn,
+# not at import. If asset_cache_dir is set (--asset-cache), generated
+# surfaces are also written there as raw pixels and read back on later
+# launches instead of being drawn again.
+ASSET_VERSION = 1  # bump when the drawing code of any cached asset changes
+ASSET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "asset_cache")
+
+asset_cache_dir = None
+assets = {}
+
+
+def load_asset(path, size, fmt):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) != size[0] * size[1] * len(fmt):
+        return None
+    return pygame.image.frombytes(data, size, fmt)
+
+
+def save_asset(path, surf, fmt):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(pygame.image.tobytes(surf, fmt))
+    os.replace(tmp, path)
+
+
+def get_asset(name, size, build, alpha=False, colorkey=None, persist=True):
+    surf = assets.get(name)
+    if surf is not None:
+        return surf
+
+    fmt = "RGBA" if alpha else "RGB"
+    path = None
+    if persist and asset_cache_dir:
+        path = os.path.join(asset_cache_dir, f"{name}-{size[0]}x{size[1]}-{fmt}-v{ASSET_VERSION}.raw")
+        surf = load_asset(path, size, fmt)
+
+    if surf is None:
+        surf = build()
+        if path:
+            save_asset(path, surf, fmt)
+
+    surf = surf.convert_alpha() if alpha else surf.convert()
+    if colorkey:
+        surf.set_colorkey(colorkey, pygame.RLEACCEL)
+    assets[name] = surf
+    return surf
+
+
+def build_table_texture():
+    texture = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    texture.fill(GREEN)
+
+    # subtle felt grid pattern
+    for i in range(0, SCREEN_WIDTH, 40):
+        pygame.draw.line(texture, (18, 80, 38), (i, 0), (i, SCREEN_HEIGHT))
+    for j in range(0, SCREEN_HEIGHT, 40):
+        pygame.draw.line(texture, (18, 80, 38), (0, j), (SCREEN_WIDTH, j))
+    return texture
 
-SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
 
-# -------------------- TABLE TEXTURE --------------------
-table_texture = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-table_texture.fill(GREEN)
+def get_table_texture():
+    return get_asset("table", (SCREEN_WIDTH, SCREEN_HEIGHT), build_table_texture)
 
-# subtle felt grid pattern
-for i in range(0, SCREEN_WIDTH, 40):
-    pygame.draw.line(table_texture, (18, 80, 38), (i, 0), (i, SCREEN_HEIGHT))
-for j in range(0, SCREEN_HEIGHT, 40):
-    pygame.draw.line(table_texture, (18, 80, 38), (0, j), (SCREEN_WIDTH, j))
 
 # -------------------- VIGNETTE LIGHTING --------------------
-vignette = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-for i in range(200):
-    alpha = int(180 * (i / 200))
-    pygame.draw.rect(
-        vignette,
-        (0, 0, 0, alpha),
-        (i, i, SCREEN_WIDTH - 2 * i, SCREEN_HEIGHT - 2 * i),
-        1
-    )
+def build_vignette():
+    vignette = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    for i in range(200):
+        alpha = int(180 * (i / 200))
+        pygame.draw.rect(
+            vignette,
+            (0, 0, 0, alpha),
+            (i, i, SCREEN_WIDTH - 2 * i, SCREEN_HEIGHT - 2 * i),
+            1
+        )
+    return vignette
 
 
-# -------------------- UTILITY FUNCTIONS --------------------
-def create_deck():
-    deck = [(rank, suit) for suit in SUITS for rank in RANKS]
-    random.shuffle(deck)
-    return deck
+def get_vignette():
+    return get_asset("vignette", (SCREEN_WIDTH, SCREEN_HEIGHT), build_vignette, alpha=True)
+
 
+# -------------------- GAME OVER OVERLAY --------------------
+def build_game_over_overlay():
+    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    overlay.fill(BLACK)
+    return overlay
 
-def card_value(card):
-    if card[0] in ['J', 'Q', 'K']:
-        return 10
-    if card[0] == 'A':
-        return 11
-    return int(card[0])
 
+def get_game_over_overlay():
+    # a plain fill is cheaper to build than to read from disk
+    overlay = get_asset("game_over_overlay", (SCREEN_WIDTH, SCREEN_HEIGHT),
+                        build_game_over_overlay, persist=False)
+    overlay.set_alpha(200)
+    return overlay
 
-def hand_value(hand):
-    value = sum(card_value(c) for c in hand)
-    aces = sum(1 for c in hand if c[0] == 'A')
-    while value > 21 and aces:
-        value -= 10
-        aces -= 1
-    return value
+
+# -------------------- UTILITY FUNCTIONS --------------------
+RAINBOW_STEPS = 32  # colours per cycle, so the cached button has a bounded set
 
 
 def rainbow(t):
+    t = round(t * RAINBOW_STEPS / math.tau) % RAINBOW_STEPS * math.tau / RAINBOW_STEPS
     return (
         int(128 + 127 * math.sin(t)),
         int(128 + 127 * math.sin(t + 2)),
@@ -84,9 +157,124 @@ def rainbow(t):
     )
 
 
+# -------------------- SURFACE CACHE --------------------
+# Rendered text, button bodies and card faces only change when their inputs
+# do, so they are built once and reused across frames. Keys hold everything
+# the surface depends on; the least recently used entry is dropped when the
+# cache is full.
+class SurfaceCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        surf = self.items.get(key)
+        if surf is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = build()
+        self.items[key] = surf
+        if len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+        return surf
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+surface_cache = SurfaceCache()
+
+
+def render_text(text, color, f=font):
+    return surface_cache.get(("text", f, text, color), lambda: f.render(text, True, color))
+
+
+# -------------------- DIRTY RECTANGLES --------------------
+# In dirty mode the UI's blits are collected instead of drawn. present()
+# compares them with the last frame's and repaints only the regions where an
+# element appeared, changed, moved or went away, over the felt background.
+# Cached surfaces never change once built, so the same surface at the same
+# spot means that part of the screen is unchanged.
+def merge_rects(rects):
+    merged = []
+    for r in rects:
+        r = r.copy()
+        i = r.collidelist(merged)
+        while i != -1:
+            r.union_ip(merged.pop(i))
+            i = r.collidelist(merged)
+        merged.append(r)
+    return merged
+
+
+class DirtyRenderer:
+    def __init__(self, background):
+        self.background = background  # called to get the surface to repaint over
+        self.recording = False
+        self.items = []
+        self.shown = None  # what is on screen now; None forces a full repaint
+
+    def blit(self, surf, pos, area=None):
+        size = area.size if area else surf.get_size()
+        self.items.append((surf, pygame.Rect(pos[0], pos[1], *size), area))
+
+    def invalidate(self):
+        self.shown = None
+
+    def present(self):
+        def key(item):
+            surf, rect, area = item
+            return id(surf), tuple(rect), tuple(area) if area else None
+
+        bounds = screen.get_rect()
+        if self.shown is None:
+            dirty = [bounds]
+        else:
+            old = {key(item): item[1] for item in self.shown}
+            new = {key(item): item[1] for item in self.items}
+            changed = [r for k, r in old.items() if k not in new]
+            changed += [r for k, r in new.items() if k not in old]
+            dirty = merge_rects([r.clip(bounds) for r in changed])
+
+        for region in dirty:
+            screen.set_clip(region)
+            screen.blit(self.background(), region, region)
+            for surf, rect, area in self.items:
+                if rect.colliderect(region):
+                    screen.blit(surf, rect, area)
+        screen.set_clip(None)
+        if dirty:
+            pygame.display.update(dirty)
+
+        # keeping the surfaces referenced also keeps their ids from being reused
+        self.shown = self.items
+        self.items = []
+        return dirty
+
+
+renderer = DirtyRenderer(get_table_texture)
+
+
+def blit(surf, pos, area=None):
+    if renderer.recording:
+        renderer.blit(surf, pos, area)
+    else:
+        screen.blit(surf, pos, area)
+
+
 # -------------------- GRAPHICS: BUTTONS --------------------
-def draw_button(text, x, y, w, h, color=GRAY):
-    rect = pygame.Rect(x, y, w, h)
+def build_button(text, w, h, color):
+    surf = pygame.Surface((w, h), pygame.SRCALPHA)
+    rect = surf.get_rect()
 
     # glossy gradient
     top = pygame.Surface((w, h // 2), pygame.SRCALPHA)
@@ -94,14 +282,20 @@ def draw_button(text, x, y, w, h, color=GRAY):
     top.fill((min(color[0] + 30, 255), min(color[1] + 30, 255), min(color[2] + 30, 255)))
     bottom.fill(color)
 
-    pygame.draw.rect(screen, color, rect, border_radius=10)
-    screen.blit(top, (x, y))
-    screen.blit(bottom, (x, y + h // 2))
-    pygame.draw.rect(screen, WHITE, rect, 2, border_radius=10)
+    pygame.draw.rect(surf, color, rect, border_radius=10)
+    surf.blit(top, (0, 0))
+    surf.blit(bottom, (0, h // 2))
+    pygame.draw.rect(surf, WHITE, rect, 2, border_radius=10)
 
     label = font.render(text, True, WHITE)
-    screen.blit(label, label.get_rect(center=rect.center))
-    return rect
+    surf.blit(label, label.get_rect(center=rect.center))
+    return surf
+
+
+def draw_button(text, x, y, w, h, color=GRAY):
+    surf = surface_cache.get(("button", text, w, h, color), lambda: build_button(text, w, h, color))
+    blit(surf, (x, y))
+    return pygame.Rect(x, y, w, h)
 
 
 # -------------------- GRAPHICS: DROPDOWN --------------------
@@ -116,243 +310,185 @@ def draw_dropdown(title, value, options, x, y, w, h, open_menu):
 
 
 # -------------------- GRAPHICS: CARDS --------------------
-def draw_card(card, x, y, scale_x=1):
-    width = int(80 * scale_x)
-    height = 120
-    r = pygame.Rect(x + (80 - width) // 2, y, width, height)
+SUIT_SYMBOLS = {'Hearts': '♥', 'Diamonds': '♦', 'Clubs': '♣', 'Spades': '♠'}
 
-    # card back during flip
-    if scale_x < 0.2:
-        shadow = pygame.Rect(r.x + 4, r.y + 4, width, height)
-        pygame.draw.rect(screen, (0, 0, 0, 80), shadow, border_radius=8)
-        pygame.draw.rect(screen, BLUE, r, border_radius=8)
-        pygame.draw.rect(screen, BLACK, r, 2, border_radius=8)
-        return
+
+# the screen has no alpha channel, so the (0, 0, 0, 80) shadow has always
+# been drawn solid; the cached surfaces keep that look
+def build_card_back(width, height):
+    surf = pygame.Surface((width + 4, height + 4), pygame.SRCALPHA)
+    r = pygame.Rect(0, 0, width, height)
+    pygame.draw.rect(surf, BLACK, r.move(4, 4), border_radius=8)
+    pygame.draw.rect(surf, BLUE, r, border_radius=8)
+    pygame.draw.rect(surf, BLACK, r, 2, border_radius=8)
+    return surf
+
+
+def build_card_face(card, width, height):
+    suit_name = card_suit(card)
+    color = RED if suit_name in ['Hearts', 'Diamonds'] else BLACK
+
+    rank = font.render(card_rank(card), True, color)
+    suit = font.render(SUIT_SYMBOLS[suit_name], True, color)
+
+    # mid-flip the card is narrower than its text; let the text hang over
+    surf_w = max(width, 8 + rank.get_width(), 8 + suit.get_width()) + 4
+    surf = pygame.Surface((surf_w, height + 4), pygame.SRCALPHA)
+    r = pygame.Rect(0, 0, width, height)
 
     # shadow
-    shadow = pygame.Rect(r.x + 4, r.y + 4, width, height)
-    pygame.draw.rect(screen, (0, 0, 0, 80), shadow, border_radius=8)
+    pygame.draw.rect(surf, BLACK, r.move(4, 4), border_radius=8)
 
     # card face
-    pygame.draw.rect(screen, WHITE, r, border_radius=8)
-    pygame.draw.rect(screen, BLACK, r, 2, border_radius=8)
-
-    suit_symbols = {'Hearts': '♥', 'Diamonds': '♦', 'Clubs': '♣', 'Spades': '♠'}
-    color = RED if card[1] in ['Hearts', 'Diamonds'] else BLACK
-
-    rank = font.render(card[0], True, color)
-    suit = font.render(suit_symbols[card[1]], True, color)
-
-    screen.blit(rank, (r.x + 8, r.y + 6))
-    screen.blit(suit, (r.x + 8, r.y + 28))
-
-
-# -------------------- GAME CLASS --------------------
-class Game:
-    def __init__(self):
-        self.money = 1500
-        self.bet = 100
-        self.wins = 0
-        self.up_points = 0
-
-        # mode toggles
-        self.roulette = False
-        self.ai = "Normal"
-        self.ai_open = False
-
-        # upgrade system
-        self.upgrades = {
-            "cards": {"lvl": 0, "max": 2},
-            "nerves": {"lvl": 0, "max": 3},
-            "payout": {"lvl": 0, "max": 3},
-        }
-
-        # round state
-        self.reset_round()
-        self.lost_screen = False
-        self.flipping = False
-        self.flip_progress = 0
-
-        # ---------------- RUSSIAN ROULETTE STATE ----------------
-        self.rr_running = False
-        self.rr_anim = 0
-        self.rr_result = None
-
-        self.rr_multiplier = 1
-        self.rr_streak = 0
-
-        self.burn_popup = ""
-        self.burn_timer = 0
-
-    def reset_round(self):
-        self.deck = create_deck()
-        self.player = []
-        self.dealer = []
-        self.dealt = False
-        self.turn = True
-        self.over = False
-        self.msg = ""
-        self.bet = max(10, min(self.bet, self.money))
-        self.lost_screen = False
-        self.flipping = False
-        self.flip_progress = 0
-
-        # reset roulette state
-        self.rr_running = False
-        self.rr_anim = 0
-        self.rr_result = None
-
-    # ---------------- RUSSIAN ROULETTE ----------------
-    def play_russian_roulette(self):
-        self.rr_running = True
-        self.rr_anim = 0
-        self.rr_result = None
-
-        # 1 bullet in 6 chambers
-        chamber = random.randint(1, 6)
-
-        # delay reveal for animation
-        pygame.time.set_timer(pygame.USEREVENT + 1, 1200, loops=1)
-
-        # store result
-        self.rr_result = (chamber == 1)
-
-    # ---------------- NORMAL BLACKJACK ----------------
-    def deal(self):
-        if self.roulette:
-            self.play_russian_roulette()
-            self.dealt = True
-            return
-        # Reworked Extra Cards: Instead of more cards, we "re-roll" the start
-        # Level 0: 1 attempt, Level 1: 2 attempts, Level 2: 3 attempts
-        attempts = 1 + self.upgrades["cards"]["lvl"]
-        best_hand = []
-        best_value = 0
-
-        for _ in range(attempts):
-            # Temporary deck for simulation to avoid draining the real deck
-            temp_deck = self.deck[:]
-            random.shuffle(temp_deck)
-            test_hand = [temp_deck.pop(), temp_deck.pop()]
-            test_val = hand_value(test_hand)
-
-            # Keep the hand if it's better than current best but not bust
-            if test_val > best_value and test_val <= 21:
-                best_hand = test_hand
-                best_value = test_val
-
-        # Apply the best hand found and remove those specific cards from the actual deck
-        self.player = best_hand
-        for card in self.player:
-            if card in self.deck:
-                self.deck.remove(card)
-
-        self.dealer = [self.deck.pop(), self.deck.pop()]
-        self.dealt = True
-        self.flipping = True
-        self.flip_progress = 0
-
-        p = hand_value(self.player)
-        d = hand_value(self.dealer)
-
-        if p == 21 and d == 21:
-            self.msg = "Both have Blackjack! PUSH"
-            self.over = True
-        elif p == 21:
-            self.msg = "Blackjack! You win!"
-            self.money += int(self.bet * 1.5)
-            self.over = True
-        elif d == 21:
-            self.msg = "Dealer has Blackjack!"
-            self.money = max(0, self.money - self.bet)
-            self.over = True
-
-    def hit(self):
-        if self.roulette:
-            return
-        self.player.append(self.deck.pop())
-        if hand_value(self.player) > 21:
-            self.lose()
-
-    def stand(self):
-        if self.roulette:
-            return
-        self.finish_dealer()
-        p, d = hand_value(self.player), hand_value(self.dealer)
-
-        if d > 21 or p > d:
-            self.win()
-        elif p < d:
-            self.lose()
-        else:
-            if self.msg == "":
-                self.msg = "Push"
-            self.over = True
+    pygame.draw.rect(surf, WHITE, r, border_radius=8)
+    pygame.draw.rect(surf, BLACK, r, 2, border_radius=8)
+
+    surf.blit(rank, (8, 6))
+    surf.blit(suit, (8, 28))
+    return surf
 
-    def finish_dealer(self):
-        if self.roulette:
-            return
 
-        nerves_level = self.upgrades["nerves"]["lvl"]
-        nerves_chance = {0: 0, 1: 0.3, 2: 0.6, 3: 0.9}[nerves_level]
+# -------------------- CARD ATLAS --------------------
+# All 52 faces plus the back are drawn once into one surface, one cell per
+# card (the extra 4px hold the shadow): suits on rows 0-3, the back on row 4.
+CARD_W, CARD_H = 80, 120
+CELL_W, CELL_H = CARD_W + 4, CARD_H + 4
+FLIP_STEP = 4  # mid-flip widths are rounded to this many px so frames repeat
+ATLAS_KEY = (255, 0, 255)
 
-        # dealer stress mechanic
-        if nerves_chance > 0 and len(self.dealer) > 1 and random.random() < nerves_chance:
-            burned_card = random.choice(self.dealer[1:])
-            self.dealer.remove(burned_card)
 
-            #  popup indicator
-            self.burn_popup = f"Dealer burned {burned_card[0]}!"
-            self.burn_timer = 60  # lasts ~1 second at 60 FPS
+def build_card_atlas():
+    atlas = pygame.Surface((CELL_W * 13, CELL_H * 5))
+    atlas.fill(ATLAS_KEY)
+    for card in range(52):
+        atlas.blit(build_card_face(card, CARD_W, CARD_H), atlas_cell(card).topleft)
+    atlas.blit(build_card_back(CARD_W, CARD_H), atlas_cell(None).topleft)
+    return atlas
 
-            # keep original message (optional)
-            self.msg = f"Dealer stressed out! Card {burned_card[0]} burned 🔥"
 
-        base = {"Easy": 15, "Normal": 17, "Hard": 19}[self.ai]
-        base += nerves_level
+def get_card_atlas():
+    # cards are opaque apart from their rounded corners, so a colorkey
+    # (RLE-accelerated) blits much faster than per-pixel alpha
+    return get_asset("cards", (CELL_W * 13, CELL_H * 5), build_card_atlas, colorkey=ATLAS_KEY)
 
-        while hand_value(self.dealer) < base:
-            self.dealer.append(self.deck.pop())
 
-    def win(self):
-        if self.roulette:
-            self.money += 1000000
-            self.msg = "Click... You survived! +$1,000,000"
-            self.over = True
-            return
+def atlas_cell(card):
+    # card None is the back
+    if card is None:
+        return pygame.Rect(0, 4 * CELL_H, CELL_W, CELL_H)
+    return pygame.Rect((card % 13) * CELL_W, (card // 13) * CELL_H, CELL_W, CELL_H)
 
-        mult = 1 + self.upgrades["payout"]["lvl"] * 0.25
-        gain = int(self.bet * mult)
-        self.money += gain
-        self.wins += 1
 
-        if self.wins % 2 == 0:
-            self.up_points += 1
+def flip_frame(card, width, size=1):
+    # a card squeezed to width for the flip animation, scaled from the atlas;
+    # size shrinks the height too, for the small cards of a multi-seat table
+    def build():
+        cell = pygame.Surface((CELL_W, CELL_H), pygame.SRCALPHA)
+        cell.blit(get_card_atlas(), (0, 0), atlas_cell(card))
+        return pygame.transform.smoothscale(cell, (max(1, width * CELL_W // CARD_W), round(CELL_H * size)))
+    return surface_cache.get(("flip", card, width, size), build)
 
-        self.msg = f"Win +${gain}"
-        self.over = True
 
-    def lose(self):
-        if self.roulette:
-            self.msg = "💥 BANG! You died!"
-            self.money = 0
-            self.over = True
-            return
+def draw_card(card, x, y, scale_x=1, size=1):
+    if scale_x >= 1 and size == 1:
+        blit(get_card_atlas(), (x, y), atlas_cell(card))
+        return
 
-        self.money = max(0, self.money - self.bet)
-        self.msg = f"You lost -${self.bet}"
-        self.over = True
+    full = round(CARD_W * size)
+    width = FLIP_STEP * round(full * scale_x / FLIP_STEP)
+    pos = (x + (full - width) // 2, y)
+
+    # card back during flip
+    blit(flip_frame(None if scale_x < 0.2 else card, width, size), pos)
+
+
+# -------------------- SEATS --------------------
+# With more than one seat the player rows get half-size cards, three rows
+# to a column between the dealer's cards and the message line.
+SEAT_SIZE = 0.5
+SEAT_ROWS = 3
+SEAT_COL_W = 260
+SEAT_ROW_H = 70
+SEAT_TOP = 310
+SEAT_CARD_STEP = 45
+OUTCOME_COLORS = {"win": GOLD, "blackjack": GOLD, "push": WHITE, "lose": (255, 120, 120)}
+
+
+def seat_layout(n):
+    # top-left corner of each seat's row, columns centered on the screen
+    cols = -(-n // SEAT_ROWS)
+    left = SCREEN_WIDTH // 2 - cols * SEAT_COL_W // 2
+    return [(left + (i // SEAT_ROWS) * SEAT_COL_W, SEAT_TOP + (i % SEAT_ROWS) * SEAT_ROW_H)
+            for i in range(n)]
+
+
+def draw_seats(g, scale_x=1):
+    # every seat's cards, with its total and, once decided, its outcome;
+    # a marker shows whose turn it is
+    for i, ((x, y), hand) in enumerate(zip(seat_layout(g.seats), g.hands)):
+        if i == g.active and not g.over:
+            blit(render_text(">", GOLD, small_font), (x, y + 22))
+        blit(render_text(f"Seat {i + 1}: {hand.value}", WHITE, small_font), (x + 12, y))
+        if g.outcomes[i]:
+            blit(render_text(g.outcomes[i], OUTCOME_COLORS[g.outcomes[i]], small_font), (x + 12, y + 18))
+        # long hands squeeze together to stay inside the column
+        step = min(SEAT_CARD_STEP, (SEAT_COL_W - 120) // max(1, len(hand) - 1))
+        for j, c in enumerate(hand):
+            draw_card(c, x + 80 + j * step, y, scale_x, SEAT_SIZE)
+
+
+# -------------------- PERFORMANCE OVERLAY --------------------
+PERF_REFRESH = 0.25  # seconds between overlay text updates, so its text stays cached
+
+
+def draw_perf_overlay(prof, perf, t):
+    # perf holds the overlay's on/off flag and the last lines it showed
+    if not perf["show"]:
+        return
+    if t - perf["updated"] >= PERF_REFRESH:
+        pct = prof.frame_percentiles()
+        means = prof.phase_means()
+        perf["lines"] = [("frame", f"p50 {pct['p50']:.2f}  p95 {pct['p95']:.2f}  p99 {pct['p99']:.2f} ms")]
+        perf["lines"] += [(name, f"{means[name]:.2f} ms") for name in PHASES]
+        perf["updated"] = t
+    for i, (label, value) in enumerate(perf["lines"]):
+        blit(render_text(label, GOLD, small_font), (SCREEN_WIDTH - 250, 8 + i * 16))
+        blit(render_text(value, GOLD, small_font), (SCREEN_WIDTH - 190, 8 + i * 16))
 
 
 # -------------------- MAIN LOOP --------------------
-def main():
+def is_animating(g):
+    return (g.flipping or g.burn_timer > 0 or g.lost_screen or g.rr_running
+            or (g.roulette and not g.dealt))  # rainbow Russian Roulette button
+
+
+def main(dirty=False, adaptive=False, profile=None, log=None, seats=1, stats=None):
     clock = pygame.time.Clock()
-    g = Game()
+
+    def new_game():
+        return Table(seats) if seats > 1 else Game()
+
+    g = new_game()
     start = time.time()
     run = True
     anim_offset = 0
+    dt = 0
+
+    # F3 toggles the overlay; --profile FILE also records every frame for export
+    prof = FrameProfiler(enabled=profile is not None, keep_history=profile is not None)
+    perf = {"show": False, "lines": [], "updated": -PERF_REFRESH}
+
+    # --log FILE appends every finished round to a round log
+    round_log = None
+    if log:
+        from roundlog import RoundWriter  # needs NumPy, which playing does not
+        round_log = RoundWriter(log)
+    # --stats FILE keeps distributions over the whole session, across restarts
+    session = SessionStats() if stats else None
+    logged = False
 
     while run:
+        prof.begin_frame()
         t = time.time() - start
         mouse = pygame.mouse.get_pos()
 
@@ -368,38 +504,34 @@ def main():
             if e.type == pygame.QUIT:
                 run = False
 
-            # ROULETTE RESULT EVENT
-            if e.type == pygame.USEREVENT + 1 and g.rr_running:
-
-                if g.rr_result:  # player died
-                    g.msg = "💥 BANG! You died!"
-                    g.money = 0
-                    g.rr_multiplier = 1
-                    g.rr_streak = 0
-
-                else:  # survived
-                    g.rr_streak += 1
-                    g.rr_multiplier = 2 ** g.rr_streak
-                    winnings = 1000000 * g.rr_multiplier
+            if e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                perf["show"] = not perf["show"]
+                prof.enabled = profile is not None or perf["show"]
 
-                    g.msg = f"Click... You survived! +${winnings:,} (x{g.rr_multiplier})"
-                    g.money += winnings
+            # the window was covered or restored; dirty mode must repaint it all
+            if e.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()
 
-                g.over = True
-                g.rr_running = False
+            # ROULETTE RESULT EVENT
+            if e.type == pygame.USEREVENT + 1 and g.rr_running:
+                g.resolve_russian_roulette()
 
             # ---------------- MOUSE CLICK ----------------
             if e.type == pygame.MOUSEBUTTONDOWN:
+                mouse = e.pos  # where the click happened, not where the mouse is now
 
                 # Restart from game over
                 if g.lost_screen:
-                    g = Game()
+                    g = new_game()
                     continue
 
                 # BEFORE DEALING
                 if not g.dealt:
                     if deal.collidepoint(mouse):
                         g.deal()
+                        if g.rr_running:
+                            # delay reveal for animation
+                            pygame.time.set_timer(pygame.USEREVENT + 1, int(ROULETTE_REVEAL_DELAY * 1000), loops=1)
                     if bet_up.collidepoint(mouse):
                         g.bet = min(g.money, g.bet + 10)
                     if bet_dn.collidepoint(mouse):
@@ -418,10 +550,7 @@ def main():
 
                     for key, btn in up_btns.items():
                         if btn.collidepoint(mouse):
-                            u = g.upgrades[key]
-                            if g.up_points > 0 and u["lvl"] < u["max"]:
-                                u["lvl"] += 1
-                                g.up_points -= 1
+                            g.buy_upgrade(key)
 
                 # AFTER DEALING
                 else:
@@ -435,57 +564,82 @@ def main():
                         if nxt.collidepoint(mouse):
                             g.reset_round()
 
+        if (round_log or session) and g.dealt and g.over and not logged:
+            if round_log:
+                round_log.append(g)
+            if session:
+                session.record(g)
+            logged = True
+        elif not g.dealt:
+            logged = False
+
+        prof.mark("events")
+
         # ---------------- DRAW TABLE BACKGROUND ----------------
-        screen.blit(table_texture, (0, 0))
+        # the game over screen and the roulette cylinder are drawn with
+        # primitives every frame, so they always repaint the whole screen
+        full_frame = g.lost_screen or (g.dealt and g.roulette and g.rr_running)
+        renderer.recording = dirty and not full_frame
+        if not renderer.recording:
+            screen.blit(get_table_texture(), (0, 0))
+            renderer.invalidate()
+        prof.mark("table")
 
         # ---------------- GAME OVER SCREEN ----------------
         if g.lost_screen:
-            anim_offset += 0.08
+            anim_offset += GAME_OVER_PULSE_SPEED * dt
             scale = 1 + 0.05 * math.sin(anim_offset)
 
             # final cards
             for i, c in enumerate(g.dealer):
                 draw_card(c, 200 + i * 90, 180)
-            for i, c in enumerate(g.player):
-                draw_card(c, 200 + i * 90, 360)
+            if seats > 1 and not g.roulette:
+                draw_seats(g)
+            else:
+                for i, c in enumerate(g.player):
+                    draw_card(c, 200 + i * 90, 360)
+            prof.mark("cards")
 
             # text
-            screen.blit(font.render(f"Dealer Final: {hand_value(g.dealer)}", True, WHITE), (200, 150))
-            screen.blit(font.render(f"Your Final: {hand_value(g.player)}", True, WHITE), (200, 340))
+            blit(render_text(f"Dealer Final: {g.dealer.value}", WHITE), (200, 150))
+            if seats == 1 or g.roulette:
+                blit(render_text(f"Your Final: {g.player.value}", WHITE), (200, 340))
 
             # dark overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(200)
-            overlay.fill(BLACK)
-            screen.blit(overlay, (0, 0))
+            blit(get_game_over_overlay(), (0, 0))
 
             # animated GAME OVER
-            loss_text = big_font.render("GAME OVER", True, RED)
+            loss_text = render_text("GAME OVER", RED, big_font)
             scaled = pygame.transform.rotozoom(loss_text, 0, scale)
-            screen.blit(scaled, scaled.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60)))
+            blit(scaled, scaled.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60)))
+
+            reason = render_text("You have no money left!", WHITE)
+            blit(reason, reason.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
 
-            reason = font.render("You have no money left!", True, WHITE)
-            screen.blit(reason, reason.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+            sub = render_text("Click to Restart", WHITE)
+            blit(sub, sub.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40)))
+            prof.mark("hud")
 
-            sub = font.render("Click to Restart", True, WHITE)
-            screen.blit(sub, sub.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40)))
+            draw_perf_overlay(prof, perf, t)
+            prof.mark("overlay")
 
             pygame.display.flip()
-            clock.tick(60)
+            prof.mark("flip")
+            prof.end_frame()
+            dt = min(clock.tick(FPS) / 1000, MAX_FRAME_DT)
             continue
 
         # ---------------- NORMAL GAME UI ----------------
 
         # title with glow
-        title = big_font.render("BLACKJACK", True, GOLD)
-        glow = big_font.render("BLACKJACK", True, GOLD)
-        screen.blit(glow, (258, 12))
-        screen.blit(title, (260, 10))
+        title = render_text("BLACKJACK", GOLD, big_font)
+        blit(title, (258, 12))
+        blit(title, (260, 10))
 
         # HUD
-        screen.blit(font.render(f"Money: ${g.money}", True, WHITE), (20, 80))
-        screen.blit(font.render(f"Bet: ${g.bet}", True, WHITE), (20, 110))
-        screen.blit(font.render(f"Upgrade Points: {g.up_points}", True, WHITE), (20, 140))
+        blit(render_text(f"Money: ${g.money}", WHITE), (20, 80))
+        blit(render_text(f"Bet: ${g.bet}", WHITE), (20, 110))
+        blit(render_text(f"Upgrade Points: {g.up_points}", WHITE), (20, 140))
 
         # betting buttons
         bet_up = draw_button("+", 140, 105, 30, 30)
@@ -499,14 +653,14 @@ def main():
 
             # RR Multiplier indicator
             if g.rr_multiplier > 1:
-                txt = font.render(f"Roulette Multiplier: x{g.rr_multiplier}", True, (255, 200, 120))
-                screen.blit(txt, (520, 150))
+                txt = render_text(f"Roulette Multiplier: x{g.rr_multiplier}", (255, 200, 120))
+                blit(txt, (520, 150))
 
             rr_col = rainbow(t * 3) if g.roulette else GRAY
             rr = draw_button("Russian Roulette", 520, 230, 240, 45, rr_col)
 
             # upgrades
-            screen.blit(font.render("Upgrades", True, WHITE), (560, 300))
+            blit(render_text("Upgrades", WHITE), (560, 300))
             up_btns = {}
             y = 330
             for k, label in [
@@ -520,12 +674,14 @@ def main():
                 y += 45
 
             hit = stand = nxt = pygame.Rect(0, 0, 0, 0)
+            prof.mark("hud")
         # ---------------- AFTER DEAL ----------------
         else:
+            prof.mark("hud")
 
             # ---------------- ROULETTE ANIMATION ----------------
             if g.roulette and g.rr_running:
-                g.rr_anim += 0.2
+                g.rr_anim += RR_SPIN_SPEED * dt
                 angle = int(g.rr_anim * 40) % 360
 
                 center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
@@ -545,16 +701,22 @@ def main():
                     pygame.draw.circle(screen, (180, 180, 180), (int(cx), int(cy)), 25)
                     pygame.draw.circle(screen, (40, 40, 40), (int(cx), int(cy)), 25, 4)
 
-                rr_title = big_font.render("Russian Roulette", True, WHITE)
-                screen.blit(rr_title, rr_title.get_rect(center=(SCREEN_WIDTH // 2, 80)))
+                rr_title = render_text("Russian Roulette", WHITE, big_font)
+                blit(rr_title, rr_title.get_rect(center=(SCREEN_WIDTH // 2, 80)))
+                prof.mark("roulette")
+
+                draw_perf_overlay(prof, perf, t)
+                prof.mark("overlay")
 
                 pygame.display.flip()
-                clock.tick(60)
+                prof.mark("flip")
+                prof.end_frame()
+                dt = min(clock.tick(FPS) / 1000, MAX_FRAME_DT)
                 continue
 
             # ---------------- NORMAL BLACKJACK RENDERING ----------------
             if g.flipping:
-                g.flip_progress += 0.08
+                g.flip_progress += FLIP_SPEED * dt
                 if g.flip_progress >= 1:
                     g.flipping = False
                 scale_x = abs(math.cos(g.flip_progress * math.pi))
@@ -566,20 +728,25 @@ def main():
             for i, c in enumerate(g.dealer):
                 draw_card(c, dealer_start_x + i * 90, 180, scale_x)
 
-            # player cards (centered row)
-            player_start_x = SCREEN_WIDTH // 2 - (len(g.player) * 90) // 2
-            for i, c in enumerate(g.player):
-                draw_card(c, player_start_x + i * 90, 360, scale_x)
+            # player cards (centered row, or a row per seat)
+            if seats > 1 and not g.roulette:
+                draw_seats(g, scale_x)
+            else:
+                player_start_x = SCREEN_WIDTH // 2 - (len(g.player) * 90) // 2
+                for i, c in enumerate(g.player):
+                    draw_card(c, player_start_x + i * 90, 360, scale_x)
+            prof.mark("cards")
 
             # Dealer Nerves popup indicator
             if g.burn_timer > 0:
-                popup = font.render(g.burn_popup, True, (255, 120, 120))
-                screen.blit(popup, popup.get_rect(center=(SCREEN_WIDTH // 2, 140)))
-                g.burn_timer -= 1
+                popup = render_text(g.burn_popup, (255, 120, 120))
+                blit(popup, popup.get_rect(center=(SCREEN_WIDTH // 2, 140)))
+                g.burn_timer -= dt
 
             # values
-            screen.blit(font.render(f"Dealer: {hand_value(g.dealer)}", True, WHITE), (50, 150))
-            screen.blit(font.render(f"Player: {hand_value(g.player)}", True, WHITE), (50, 520))
+            blit(render_text(f"Dealer: {g.dealer.value}", WHITE), (50, 150))
+            if seats == 1 or g.roulette:
+                blit(render_text(f"Player: {g.player.value}", WHITE), (50, 520))
 
             # action buttons
             if not g.over:
@@ -587,8 +754,8 @@ def main():
                 stand = draw_button("Stand", SCREEN_WIDTH // 2 + 20, 530, 100, 40)
                 nxt = pygame.Rect(0, 0, 0, 0)
             else:
-                msg = font.render(g.msg, True, WHITE)
-                screen.blit(msg, msg.get_rect(center=(SCREEN_WIDTH // 2, 520)))
+                msg = render_text(g.msg, WHITE)
+                blit(msg, msg.get_rect(center=(SCREEN_WIDTH // 2, 520)))
 
                 nxt = draw_button("Next Round", SCREEN_WIDTH // 2 - 90, 560, 180, 40)
                 hit = stand = pygame.Rect(0, 0, 0, 0)
@@ -596,15 +763,64 @@ def main():
             deal = rr = ai_btn = pygame.Rect(0, 0, 0, 0)
             ai_opts = []
             up_btns = {}
+            prof.mark("hud")
 
         # ---------------- FINAL TOUCH: VIGNETTE ----------------
 
-        pygame.display.flip()
-        clock.tick(60)
+        draw_perf_overlay(prof, perf, t)
+        prof.mark("overlay")
+
+        if renderer.recording:
+            renderer.present()
+            prof.mark("present")
+        else:
+            pygame.display.flip()
+        prof.mark("flip")
+        prof.end_frame()
+
+        # ---------------- ADAPTIVE FRAME RATE ----------------
+        # with nothing moving, poll for input at a low rate instead of
+        # redrawing the same frame 60 times a second
+        if adaptive and not is_animating(g):
+            clock.tick(IDLE_FPS)
+            dt = 1 / FPS  # idle time is not animation time
+        else:
+            dt = min(clock.tick(FPS) / 1000, MAX_FRAME_DT)
+
+    if profile:
+        prof.export(profile)
+        pct = prof.frame_percentiles()
+        print(f"frame time p50 {pct['p50']:.2f} ms, p95 {pct['p95']:.2f} ms, p99 {pct['p99']:.2f} ms "
+              f"over the last {len(prof.window)} frames; per-phase timings written to {profile}")
+    if round_log:
+        round_log.close()
+    if session:
+        print_summary(session.to_dict())
+        session.dump(stats)
 
     pygame.quit()
 
 
 # -------------------- PROGRAM ENTRY --------------------
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Play BlackJack.")
+    parser.add_argument("--dirty", action="store_true",
+                        help="only repaint the parts of the screen that changed (for slow hardware)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="run at full frame rate only while something is animating")
+    parser.add_argument("--asset-cache", nargs="?", const=ASSET_CACHE_DIR, default=None, metavar="DIR",
+                        help="keep generated backgrounds and card art on disk between launches")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="time every frame and write per-phase timings to FILE (.csv or .json) at exit")
+    parser.add_argument("--log", metavar="FILE", default=None,
+                        help="append every finished round to a binary round log (see roundlog.py)")
+    parser.add_argument("--stats", metavar="FILE", default=None,
+                        help="print session statistics at exit and write them to FILE as JSON")
+    parser.add_argument("--seats", type=int, choices=range(1, MAX_SEATS + 1), default=1,
+                        help="play this many hands a round against one dealer")
+    args = parser.parse_args()
+    if args.log and args.seats > 1:
+        parser.error("--log records single-seat rounds only")
+    asset_cache_dir = args.asset_cache
+    main(dirty=args.dirty, adaptive=args.adaptive, profile=args.profile, log=args.log, seats=args.seats,
+         stats=args.stats)
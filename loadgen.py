@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from profiler import percentile
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# -------------------- CLIENT --------------------
+class Client:
+    def __init__(self, reader, writer, latencies):
+        self.reader = reader
+        self.writer = writer
+        self.latencies = latencies
+
+    async def send(self, line):
+        start = time.perf_counter()
+        self.writer.write(line.encode() + b"\n")
+        while True:
+            reply = json.loads(await self.reader.readline())
+            if "event" not in reply:  # pushed roulette results are not replies
+                break
+        self.latencies.append(time.perf_counter() - start)
+        return reply
+
+
+async def connect(address):
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+
+async def play(address, tables, stop_at, latencies, seed):
+    # one connection playing its tables in turn, one command in flight;
+    # the player stands on 17 like a Normal dealer
+    client = Client(*await connect(address), latencies)
+    ids = []
+    for i in range(tables):
+        ids.append((await client.send(f"new {seed}:{i}"))["table"])
+
+    rounds = 0
+    while time.perf_counter() < stop_at:
+        for t in ids:
+            state = await client.send(f"deal {t}")
+            while not state["over"]:
+                cmd = "hit" if state["player_value"] < 17 else "stand"
+                state = await client.send(f"{cmd} {t}")
+            await client.send(f"next {t}")
+            rounds += 1
+
+    client.writer.write(b"quit\n")
+    client.writer.close()
+    return rounds
+
+
+async def run_load(address, connections, tables, seconds):
+    latencies = []
+    start = time.perf_counter()
+    stop_at = start + seconds
+    rounds = await asyncio.gather(*(play(address, tables, stop_at, latencies, i)
+                                    for i in range(connections)))
+    elapsed = time.perf_counter() - start
+    values = sorted(latencies)
+    return {
+        "connections": connections,
+        "tables": connections * tables,
+        "commands": len(values),
+        "rounds": sum(rounds),
+        "seconds": elapsed,
+        "commands_per_sec": len(values) / elapsed,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+
+
+def spawn_server(path):
+    # a server of our own on a throwaway Unix socket
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "server.py"), "--unix", path],
+                            stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()  # "serving tables on ..."
+    return proc
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive a table server and report command latency.")
+    parser.add_argument("-c", "--connections", type=int, default=50)
+    parser.add_argument("-t", "--tables", type=int, default=20, help="tables per connection")
+    parser.add_argument("-s", "--seconds", type=float, default=10)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--spawn", action="store_true", help="start a server on a temporary Unix socket")
+    args = parser.parse_args(argv)
+
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        address = args.unix or (args.host, args.port)
+        if args.spawn:
+            address = os.path.join(tmp, "tables.sock")
+            server = spawn_server(address)
+        try:
+            stats = asyncio.run(run_load(address, args.connections, args.tables, args.seconds))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    print(f"{stats['connections']} connections, {stats['tables']} tables, {stats['seconds']:.1f}s")
+    print(f"commands: {stats['commands']}  rounds: {stats['rounds']}")
+    print(f"commands/s: {stats['commands_per_sec']:,.0f}")
+    print(f"latency p50 {stats['p50_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms  max {stats['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
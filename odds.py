@@ -0,0 +1,116 @@
+from functools import lru_cache
+
+from engine import DEALER_THRESHOLDS, HARD_VALUES, NERVES_BURN_CHANCE, hand_total
+
+# Exact dealer odds. The deck is reduced to a composition: a tuple of how
+# many cards of each hard value 1-10 are left (index 0 = aces, index 9 =
+# tens and faces), which is all the dealer's draw loop can see.
+# Distributions are tuples indexed by final dealer total; every bust total
+# is folded into index BUST.
+BUST = 22
+CACHE_SIZE = 1 << 18
+
+
+def composition(cards):
+    counts = [0] * 10
+    for c in cards:
+        counts[HARD_VALUES[c] - 1] += 1
+    return tuple(counts)
+
+
+# -------------------- DEALER DRAW LOOP --------------------
+@lru_cache(maxsize=CACHE_SIZE)
+def _draw(hard, has_ace, comp, base):
+    value = hand_total(hard, has_ace)
+    dist = [0.0] * (BUST + 1)
+    if value >= base:
+        dist[min(value, BUST)] = 1.0
+        return tuple(dist)
+
+    left = sum(comp)
+    if left == 0:
+        # the shoe ran dry; treat it as the dealer standing where they are
+        dist[value] = 1.0
+        return tuple(dist)
+
+    for i, count in enumerate(comp):
+        if not count:
+            continue
+        p = count / left
+        rest = comp[:i] + (count - 1,) + comp[i + 1:]
+        sub = _draw(hard + i + 1, has_ace or i == 0, rest, base)
+        for total, q in enumerate(sub):
+            if q:
+                dist[total] += p * q
+    return tuple(dist)
+
+
+def _hand_state(cards):
+    return sum(HARD_VALUES[c] for c in cards), any(HARD_VALUES[c] == 1 for c in cards)
+
+
+def dealer_final_distribution(dealer, deck=None, ai="Normal", nerves=0, comp=None):
+    # Probability of each final dealer total for Game.finish_dealer, given
+    # the dealer's cards and what is left in the deck: either the cards
+    # themselves (any sequence) or, as comp=, their composition. With
+    # Dealer Nerves, each card after the first is equally likely to be
+    # burned, and the burned card is not returned to the deck.
+    if (deck is None) == (comp is None):
+        raise ValueError("give either the deck's cards or comp=, not both")
+    if comp is None:
+        comp = composition(deck)
+    comp = tuple(comp)
+    base = DEALER_THRESHOLDS[ai] + nerves
+    dealer = list(dealer)
+
+    dist = _draw(*_hand_state(dealer), comp, base)
+    chance = NERVES_BURN_CHANCE[nerves]
+    if chance > 0 and len(dealer) > 1:
+        burned = [0.0] * (BUST + 1)
+        for j in range(1, len(dealer)):
+            sub = _draw(*_hand_state(dealer[:j] + dealer[j + 1:]), comp, base)
+            for total, q in enumerate(sub):
+                burned[total] += q / (len(dealer) - 1)
+        dist = tuple((1 - chance) * a + chance * b for a, b in zip(dist, burned))
+    return dist
+
+
+def dealer_upcard_distribution(upcard, comp, ai="Normal", nerves=0):
+    # Like dealer_final_distribution, but only the dealer's first card is
+    # known (upcard is its hard value 1-10, comp excludes it). The second
+    # card is drawn from comp, conditioned on the dealer not having
+    # Blackjack, because deal() ends the round before the player acts then.
+    base = DEALER_THRESHOLDS[ai] + nerves
+    chance = NERVES_BURN_CHANCE[nerves]
+    left = sum(comp)
+    dist = [0.0] * (BUST + 1)
+    weight = 0.0
+    for i, count in enumerate(comp):
+        hole = i + 1
+        if not count or hand_total(upcard + hole, upcard == 1 or hole == 1) == 21:
+            continue
+        p = count / left
+        weight += p
+        rest = comp[:i] + (count - 1,) + comp[i + 1:]
+        kept = _draw(upcard + hole, upcard == 1 or hole == 1, rest, base)
+        # with two cards, Dealer Nerves can only burn the second one
+        burned = _draw(upcard, upcard == 1, rest, base)
+        for total in range(BUST + 1):
+            dist[total] += p * ((1 - chance) * kept[total] + chance * burned[total])
+    return tuple(q / weight for q in dist)
+
+
+def dealer_odds(dealer, deck=None, ai="Normal", nerves=0, comp=None):
+    # readable form of dealer_final_distribution: {total: p, ..., "bust": p}
+    dist = dealer_final_distribution(dealer, deck, ai, nerves, comp)
+    odds = {total: p for total, p in enumerate(dist[:BUST]) if p}
+    odds["bust"] = dist[BUST]
+    return odds
+
+
+def cache_info():
+    return _draw.cache_info()
+
+
+def clear_cache():
+    _draw.cache_clear()
@@ -0,0 +1,176 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+from engine import AI_DIFFICULTIES, DEALER_THRESHOLDS, NERVES_BURN_CHANCE, PAYOUT_STEP, Game
+from simulate import POLICIES, simulate
+from strategy import load_table
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HERE, "upgrade_cache")
+# bump when the engine changes in a way the rule fingerprint below misses
+CACHE_VERSION = 1
+
+MAX_LEVELS = {key: u["max"] for key, u in Game().upgrades.items()}
+SHORT = {"cards": "C", "nerves": "N", "payout": "P"}
+
+
+# -------------------- PURCHASE ORDERS --------------------
+def purchase_orders():
+    # every distinct order of buying all upgrade levels, e.g. (payout,
+    # payout, nerves, ...); 560 with the current maxima
+    picks = [key for key, top in MAX_LEVELS.items() for _ in range(top)]
+    return sorted(set(permutations(picks)))
+
+
+# -------------------- PER-CELL STATISTICS --------------------
+# A cell is one difficulty and one set of upgrade levels. Its statistics
+# come from simulate.py and are cached on disk under a key built from the
+# rules that cell actually uses, so changing, say, the level 2 burn chance
+# only recomputes the cells with Dealer Nerves at level 2.
+def cell_rules(ai, cards, nerves, payout):
+    return {
+        "dealer_stands_on": DEALER_THRESHOLDS[ai] + nerves,
+        "starting_luck_attempts": 1 + cards,
+        "burn_chance": NERVES_BURN_CHANCE[nerves],
+        "win_multiplier": 1 + payout * PAYOUT_STEP,
+    }
+
+
+def cell_key(cell, settings):
+    ai, cards, nerves, payout = cell
+    data = {"version": CACHE_VERSION, "rules": cell_rules(ai, cards, nerves, payout),
+            "cell": list(cell), **settings}
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def cache_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def load_cell(key, cache_dir=CACHE_DIR):
+    try:
+        with open(cache_path(key, cache_dir)) as f:
+            return json.load(f)["stats"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cell(key, cell, stats, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(key, cache_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"cell": list(cell), "stats": stats}, f)
+    os.replace(tmp, path)
+
+
+def evaluate_cell(job):
+    cell, settings = job
+    ai, cards, nerves, payout = cell
+    s = simulate(settings["rounds"], settings["policy"], ai, cards, nerves, payout,
+                 settings["bet"], settings["seed"], settings["decks"], workers=1)
+    return {
+        "money_per_round": s["mean_delta"],
+        # win() awards a point every second win; a Blackjack is not a win()
+        "points_per_round": (s["win_rate"] - s["blackjack_rate"]) / 2,
+    }
+
+
+def cell_stats(settings, workers=1, cache_dir=CACHE_DIR):
+    cells = [(ai, c, n, p) for ai in AI_DIFFICULTIES for c in range(MAX_LEVELS["cards"] + 1)
+             for n in range(MAX_LEVELS["nerves"] + 1) for p in range(MAX_LEVELS["payout"] + 1)]
+    stats, missing = {}, []
+    for cell in cells:
+        key = cell_key(cell, settings)
+        cached = load_cell(key, cache_dir)
+        if cached is None:
+            missing.append(cell)
+        else:
+            stats[cell] = cached
+
+    # solve strategy tables here rather than racing in the workers
+    if settings["policy"] == "optimal":
+        for ai, _, nerves, payout in missing:
+            load_table(ai, nerves, payout, settings["decks"])
+
+    def collect(results):
+        # each cell is saved as it arrives, so an interrupted run keeps its work
+        for cell, result in zip(missing, results):
+            save_cell(cell_key(cell, settings), cell, result, cache_dir)
+            stats[cell] = result
+
+    jobs = [(cell, settings) for cell in missing]
+    if workers == 1:
+        collect(map(evaluate_cell, jobs))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            collect(pool.map(evaluate_cell, jobs))
+    return stats, len(missing)
+
+
+# -------------------- RANKING --------------------
+def money_per_hour(order, ai, stats, hours, rounds_per_hour):
+    # Expected money over a session that buys upgrades in `order` as soon
+    # as each point arrives, averaged per hour. Between purchases the
+    # player spends the expected rounds-to-a-point at the current levels.
+    levels = dict.fromkeys(MAX_LEVELS, 0)
+    rounds_left = hours * rounds_per_hour
+    money = 0.0
+    for key in (*order, None):
+        s = stats[(ai, levels["cards"], levels["nerves"], levels["payout"])]
+        if key is None or not s["points_per_round"]:
+            money += rounds_left * s["money_per_round"]
+            break
+        rounds = min(rounds_left, 1 / s["points_per_round"])
+        money += rounds * s["money_per_round"]
+        rounds_left -= rounds
+        if rounds_left <= 0:
+            break
+        levels[key] += 1
+    return money / hours
+
+
+def rank(stats, hours, rounds_per_hour):
+    rows = [(money_per_hour(order, ai, stats, hours, rounds_per_hour), ai, order)
+            for ai in AI_DIFFICULTIES for order in purchase_orders()]
+    rows.sort(key=lambda row: -row[0])
+    return rows
+
+
+def print_ranking(rows, top):
+    print(f"{'rank':>4}  {'ai':<7} {'order':<16} {'$/hour':>12}")
+    for i, (value, ai, order) in enumerate(rows[:top], 1):
+        print(f"{i:>4}  {ai:<7} {' '.join(SHORT[k] for k in order):<16} {value:>12,.0f}")
+    print("\nbest per difficulty:")
+    for ai in AI_DIFFICULTIES:
+        value, _, order = next(row for row in rows if row[1] == ai)
+        print(f"  {ai:<7} {' '.join(SHORT[k] for k in order):<16} {value:>12,.0f}")
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank upgrade purchase orders by money per hour.")
+    parser.add_argument("-n", "--rounds", type=int, default=200000, help="simulated rounds per cell")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="stand17")
+    parser.add_argument("--bet", type=int, default=100)
+    parser.add_argument("--decks", type=int, choices=range(1, 9), default=1)
+    parser.add_argument("--seed", type=int, default=1, help="the same seed is used for every cell")
+    parser.add_argument("--hours", type=float, default=1.0, help="session length")
+    parser.add_argument("--rounds-per-hour", type=float, default=120)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    settings = {"rounds": args.rounds, "policy": args.policy, "bet": args.bet,
+                "decks": args.decks, "seed": args.seed}
+    stats, computed = cell_stats(settings, args.workers)
+    print(f"{len(stats)} cells, {computed} simulated, {len(stats) - computed} from {CACHE_DIR}\n")
+    print_ranking(rank(stats, args.hours, args.rounds_per_hour), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import csv
+import json
+import time
+from array import array
+from collections import deque
+
+# Per-frame timing for the main loop. The loop calls begin_frame() at the
+# top of a frame, mark(name) when a phase finishes (the time since the
+# previous mark is charged to that phase) and end_frame() before it sleeps.
+# Everything is a no-op until the profiler is enabled. Only the last
+# `window` frames are kept unless keep_history is set for export().
+# In dirty-rect mode the blits happen in present(), not in "cards"/"hud".
+PHASES = ["events", "table", "cards", "hud", "roulette", "overlay", "present", "flip"]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))
+    return sorted_values[i]
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False, window=600, keep_history=False):
+        self.enabled = enabled
+        self.keep_history = keep_history
+        self.window = deque(maxlen=window)  # recent frame times, ms
+        self.recent = {name: deque(maxlen=window) for name in PHASES}
+        # full history for export, one compact column per phase
+        self.history = {name: array('d') for name in ["frame"] + PHASES}
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter()
+        for name in PHASES:
+            self.current[name] = 0.0
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[name] += (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self):
+        if not self.enabled or not self.frame_start:
+            return
+        total = (time.perf_counter() - self.frame_start) * 1000
+        self.window.append(total)
+        for name in PHASES:
+            self.recent[name].append(self.current[name])
+        if self.keep_history:
+            self.history["frame"].append(total)
+            for name in PHASES:
+                self.history[name].append(self.current[name])
+        self.frame_start = 0.0
+
+    # ---------------- SUMMARIES ----------------
+    def frame_percentiles(self):
+        values = sorted(self.window)
+        return {f"p{q}": percentile(values, q) for q in (50, 95, 99)}
+
+    def phase_means(self):
+        return {name: sum(v) / len(v) if v else 0.0 for name, v in self.recent.items()}
+
+    def summary(self):
+        frames = len(self.history["frame"])
+        out = {"frames": frames}
+        for name, column in self.history.items():
+            values = sorted(column)
+            out[name] = {
+                "mean_ms": sum(values) / frames if frames else 0.0,
+                **{f"p{q}_ms": percentile(values, q) for q in (50, 95, 99)},
+            }
+        return out
+
+    # ---------------- EXPORT ----------------
+    def export(self, path):
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"summary": self.summary(),
+                           "frames": {name: list(col) for name, col in self.history.items()}}, f)
+            return
+        columns = ["frame"] + PHASES
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["index"] + [f"{name}_ms" for name in columns])
+            for i, row in enumerate(zip(*(self.history[name] for name in columns))):
+                writer.writerow([i] + [f"{v:.4f}" for v in row])
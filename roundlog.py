@@ -0,0 +1,271 @@
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from engine import AI_DIFFICULTIES, Game
+
+# -------------------- RECORD FORMAT --------------------
+# A log is an 8-byte header followed by fixed-size little-endian records,
+# one per finished round. Fixed-size records make the file an array on
+# disk: the reader memory-maps it and every field is a NumPy column.
+# Hands are stored padded to MAX_CARDS with NO_CARD.
+MAGIC = b"BJRL"
+VERSION = 1
+MAX_CARDS = 22  # 21 aces from an 8-deck shoe, then the card that busts
+NO_CARD = 255
+OUTCOMES = ["win", "blackjack", "push", "lose"]
+
+FIELDS = [
+    ("money_before", "q"),
+    ("money_after", "q"),
+    ("bet", "q"),
+    ("payout", "q"),        # money_after - money_before
+    ("ai", "B"),            # index into AI_DIFFICULTIES
+    ("cards_lvl", "B"),
+    ("nerves_lvl", "B"),
+    ("payout_lvl", "B"),
+    ("outcome", "B"),       # index into OUTCOMES
+    ("roulette", "B"),
+    ("rr_chamber", "B"),    # 1-6, 0 outside roulette; 1 is the bullet
+    ("rr_streak", "B"),     # survival streak after the round
+    ("hits", "B"),          # player actions: this many hits...
+    ("stood", "B"),         # ...then a stand (0 if the round ended first)
+    ("burned", "B"),        # card Dealer Nerves burned, or NO_CARD
+    ("n_player", "B"),
+    ("n_dealer", "B"),
+    ("player", f"{MAX_CARDS}B"),  # dealt cards in order
+    ("dealer", f"{MAX_CARDS}B"),  # final hand, after any burn
+]
+
+HEADER = struct.Struct("<4sHH")  # magic, version, record size
+RECORD = struct.Struct("<" + "".join(code for _, code in FIELDS))
+
+
+def _np_field(name, code):
+    if code[0].isdigit():
+        return (name, "u1", (int(code[:-1]),))
+    return (name, {"q": "<i8", "B": "u1"}[code])
+
+
+RECORD_DTYPE = np.dtype([_np_field(name, code) for name, code in FIELDS])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+def _padded(hand):
+    if len(hand) > MAX_CARDS:
+        raise ValueError(f"hand of {len(hand)} cards does not fit in a log record")
+    return (*hand, *(NO_CARD,) * (MAX_CARDS - len(hand)))
+
+
+def pack_round(g):
+    # one finished round of g as a record
+    if not g.over:
+        raise ValueError("only finished rounds can be logged")
+    return RECORD.pack(
+        g.start_money, g.money, g.bet, g.money - g.start_money,
+        AI_DIFFICULTIES.index(g.ai),
+        g.upgrades["cards"]["lvl"], g.upgrades["nerves"]["lvl"], g.upgrades["payout"]["lvl"],
+        OUTCOMES.index(g.outcome),
+        g.roulette, g.rr_chamber, g.rr_streak,
+        max(0, len(g.player) - 2), g.stood,
+        NO_CARD if g.burned is None else g.burned,
+        len(g.player), len(g.dealer),
+        *_padded(g.player), *_padded(g.dealer),
+    )
+
+
+def _check_header(data, path):
+    magic, version, size = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION or size != RECORD.size:
+        raise ValueError(f"{path} is not a version {VERSION} round log")
+
+
+# -------------------- WRITER --------------------
+class RoundWriter:
+    # buffered appends; records reach the file every buffer_rounds rounds
+    # and on flush()/close()
+    def __init__(self, path, buffer_rounds=4096):
+        self.path = path
+        self.buffer_rounds = buffer_rounds
+        self.buffer = bytearray()
+        self.pending = 0
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            with open(path, "rb") as f:
+                _check_header(f.read(HEADER.size), path)
+
+    def append(self, g):
+        self.buffer += pack_round(g)
+        self.pending += 1
+        if self.pending >= self.buffer_rounds:
+            self.flush()
+
+    def extend(self, records):
+        # records already packed with pack_round, e.g. by worker processes
+        self.flush()
+        self.file.write(records)
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+            self.pending = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------- REPLAY --------------------
+class ReplayRng:
+    # Stands in for the game's RNG so the engine deals exactly the logged
+    # cards: the shoe is "shuffled" into the logged draw order, Starting
+    # Luck always looks at the top two cards, and the burn and roulette
+    # draws return what the log says happened.
+    def __init__(self, stack, burned, chamber):
+        self.stack = stack
+        self.burned = burned
+        self.chamber = chamber
+
+    def shuffle(self, cards):
+        cards[:] = self.stack
+
+    def randrange(self, n):
+        return n - 1
+
+    def random(self):
+        return 0.0 if self.burned is not None else 1.0
+
+    def choice(self, seq):
+        return self.burned
+
+    def randint(self, a, b):
+        return self.chamber
+
+
+def replay(rec):
+    # plays a logged round through the engine again; returns the Game
+    player = [int(c) for c in rec["player"][:rec["n_player"]]]
+    dealer = [int(c) for c in rec["dealer"][:rec["n_dealer"]]]
+    burned = None if rec["burned"] == NO_CARD else int(rec["burned"])
+
+    if burned is not None:  # the burn always takes the hole card
+        first, draws = [dealer[0], burned], dealer[1:]
+    else:
+        first, draws = dealer[:2], dealer[2:]
+    # the shoe pops from the end: player's two, dealer's two, hits, dealer draws
+    stack = draws[::-1] + player[2:][::-1] + first[::-1] + player[:2][::-1]
+
+    g = Game(rng=ReplayRng(stack, burned, int(rec["rr_chamber"])))
+    g.ai = AI_DIFFICULTIES[rec["ai"]]
+    g.upgrades["cards"]["lvl"] = int(rec["cards_lvl"])
+    g.upgrades["nerves"]["lvl"] = int(rec["nerves_lvl"])
+    g.upgrades["payout"]["lvl"] = int(rec["payout_lvl"])
+    g.money = int(rec["money_before"])
+    g.bet = int(rec["bet"])
+
+    if rec["roulette"]:
+        g.roulette = True
+        survived = rec["rr_chamber"] != 1
+        g.rr_streak = int(rec["rr_streak"]) - 1 if survived else 0
+        g.deal()
+        g.resolve_russian_roulette()
+        return g
+
+    g.deal()
+    for _ in range(rec["hits"]):
+        g.hit()
+    if rec["stood"]:
+        g.stand()
+    return g
+
+
+def replay_matches(rec):
+    g = replay(rec)
+    return (g.money == rec["money_after"] and g.outcome == OUTCOMES[rec["outcome"]]
+            and list(g.player) == list(rec["player"][:rec["n_player"]])
+            and list(g.dealer) == list(rec["dealer"][:rec["n_dealer"]]))
+
+
+# -------------------- READER --------------------
+class RoundLog:
+    # Memory-mapped view of a log. log["bet"] is the bet column as a NumPy
+    # array; nothing is read from disk until a column is used. A partial
+    # record left by a crash mid-write is ignored.
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            _check_header(f.read(HEADER.size), path)
+        count = (os.path.getsize(path) - HEADER.size) // RECORD.size
+        if count:
+            self.records = np.memmap(path, RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, column):
+        return self.records[column]
+
+    def replay(self, i):
+        return replay(self.records[i])
+
+    def verify(self, start=0, stop=None):
+        # indexes of logged rounds that the engine does not reproduce
+        return [i for i in range(start, len(self) if stop is None else stop)
+                if not replay_matches(self.records[i])]
+
+    def summary(self):
+        n = len(self)
+        outcomes = np.bincount(self["outcome"], minlength=len(OUTCOMES))
+        payout = self["payout"]
+        return {
+            "rounds": n,
+            **{f"{name}_rate": outcomes[i] / n if n else 0.0 for i, name in enumerate(OUTCOMES)},
+            "mean_payout": float(payout.mean()) if n else 0.0,
+            "total_payout": int(payout.sum()),
+            "burn_rate": float((self["burned"] != NO_CARD).mean()) if n else 0.0,
+            "roulette_rounds": int(np.count_nonzero(self["roulette"])),
+            "mean_hits": float(self["hits"].mean()) if n else 0.0,
+        }
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize and replay a BlackJack round log.")
+    parser.add_argument("log")
+    parser.add_argument("--verify", action="store_true", help="replay every round through the engine")
+    parser.add_argument("--show", type=int, metavar="N", help="print round N and its replay")
+    args = parser.parse_args(argv)
+
+    log = RoundLog(args.log)
+    for key, value in log.summary().items():
+        print(f"{key + ':':<17}{value:,.4f}" if isinstance(value, float) else f"{key + ':':<17}{value:,}")
+
+    if args.show is not None:
+        rec = log.records[args.show]
+        print({name: rec[name].tolist() for name in RECORD_DTYPE.names})
+        g = log.replay(args.show)
+        print(f"replay: {g.msg!r}, money {g.money:,}")
+
+    if args.verify:
+        bad = log.verify()
+        print(f"replayed {len(log):,} rounds, {len(bad)} mismatch(es)")
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,266 @@
+import argparse
+import math
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from engine import AI_DIFFICULTIES, PAYOUT_STEP, hand_total
+from odds import BUST, dealer_upcard_distribution
+from simulate import STAND_ON
+from strategy import fresh_composition, hit_outcomes, load_table
+
+# Risk of ruin without simulating. Each round is reduced to four payoffs,
+# as deal(), win() and lose() pay them for a bet b:
+#   blackjack +int(1.5 b), win +int(b * payout multiplier), push 0, lose -b
+# Their probabilities come from the rules (see round_distribution), and the
+# bankroll is then a Markov chain on money that ends at 0 (ruin) or when
+# the session target is reached.
+OUTCOMES = ["blackjack", "win", "push", "lose"]
+MIN_BET = 10
+MAX_STATES = 50000  # above this, the money grid gets coarser
+BET_STEPS = 400  # grid points per bet once bets are over $400
+
+
+# -------------------- PER-ROUND PAYOFFS --------------------
+def starting_hands(comp, attempts):
+    # {(total, soft): p} for the hand Starting Luck keeps: the best of
+    # `attempts` two-card draws, ties going to the earliest draw
+    left = sum(comp)
+    pairs = {}
+    for i, a in enumerate(comp):
+        for j, b in enumerate(comp):
+            count = b - (i == j)
+            if not a or count <= 0:
+                continue
+            hard = i + j + 2
+            key = (hand_total(hard, i == 0 or j == 0), i == 0 or j == 0)
+            pairs[key] = pairs.get(key, 0.0) + a / left * count / (left - 1)
+
+    values = {}
+    for (total, _), p in pairs.items():
+        values[total] = values.get(total, 0.0) + p
+    hands = {}
+    for (total, soft), p in pairs.items():
+        below = sum(q for v, q in values.items() if v < total)
+        upto = below + values[total]
+        # the first draw to reach this total is draw k; earlier ones were
+        # lower, later ones no higher
+        weight = sum(below ** (k - 1) * upto ** (attempts - k) for k in range(1, attempts + 1))
+        hands[(total, soft)] = p * weight
+    return hands
+
+
+def round_distribution(ai="Normal", cards=0, nerves=0, payout=0, play="stand17", decks=1):
+    # Probability of each of OUTCOMES for one round. Like strategy.solve,
+    # draws come from a fresh shoe minus the dealer's upcard. With Starting
+    # Luck this is optimistic: in play the rerolls keep taking aces and
+    # tens out of the live shoe, so later deals in a shoe see fewer.
+    if play == "optimal":
+        table = load_table(ai, nerves, payout, decks)
+    else:
+        threshold = STAND_ON[play]
+
+    full = fresh_composition(decks)
+    hands = starting_hands(full, 1 + cards)
+    probs = dict.fromkeys(OUTCOMES, 0.0)
+
+    for up in range(1, 11):
+        p_up = full[up - 1] / sum(full)
+        comp = list(full)
+        comp[up - 1] -= 1
+        comp = tuple(comp)
+        left = sum(comp)
+        draw = [(k + 1, count / left) for k, count in enumerate(comp) if count]
+        # the hole card that gives the dealer Blackjack
+        hole = 10 if up == 1 else 1 if up == 10 else None
+        p_natural = comp[hole - 1] / left if hole else 0.0
+        dealer = dealer_upcard_distribution(up, comp, ai, nerves)
+
+        if play == "optimal":
+            def hits(total, soft):
+                return table.should_hit_value(total, soft, up)
+        else:
+            def hits(total, soft):
+                return total < threshold
+
+        @lru_cache(maxsize=None)
+        def final(total, soft):
+            # distribution of the player's final total, index BUST for a bust
+            dist = [0.0] * (BUST + 1)
+            if not hits(total, soft):
+                dist[total] = 1.0
+                return dist
+            for p, new_total, new_soft in hit_outcomes(total, soft, draw):
+                if new_total > 21:
+                    dist[BUST] += p
+                else:
+                    for t, q in enumerate(final(new_total, new_soft)):
+                        dist[t] += p * q
+            return dist
+
+        for (total, soft), p_hand in hands.items():
+            p = p_up * p_hand
+            if total == 21:  # two-card 21
+                probs["push"] += p * p_natural
+                probs["blackjack"] += p * (1 - p_natural)
+                continue
+            probs["lose"] += p * p_natural
+            p *= 1 - p_natural
+            player = final(total, soft)
+            probs["lose"] += p * player[BUST]
+            for t in range(BUST):
+                if not player[t]:
+                    continue
+                beats = dealer[BUST] + sum(dealer[:t])
+                ties = dealer[t]
+                probs["win"] += p * player[t] * beats
+                probs["push"] += p * player[t] * ties
+                probs["lose"] += p * player[t] * (1 - beats - ties)
+    return probs
+
+
+def round_ev(probs, payout=0):
+    # expected money per unit bet, ignoring int() rounding
+    return 1.5 * probs["blackjack"] + (1 + payout * PAYOUT_STEP) * probs["win"] - probs["lose"]
+
+
+# -------------------- BET POLICIES --------------------
+# a bet policy maps an array of money amounts to the bets placed
+def flat_bet(amount):
+    def policy(money):
+        return np.full_like(money, amount)
+    return policy
+
+
+def fraction_bet(fraction):
+    # a share of the bankroll, in the game's steps of 10
+    def policy(money):
+        return np.floor(money * fraction / MIN_BET) * MIN_BET
+    return policy
+
+
+def all_in(money):
+    return money.copy()
+
+
+# -------------------- BANKROLL CHAIN --------------------
+def _bets(bet, money):
+    # reset_round() clamps the bet to 10..money
+    return np.maximum(MIN_BET, np.minimum(bet(money), money))
+
+
+def money_grid(bet, target, max_states=MAX_STATES):
+    # Bankroll states from 0 to target. Steps are $1 until the bet passes
+    # BET_STEPS dollars and then grow with it, so one bet always spans
+    # about BET_STEPS states whatever the bankroll: flat bets get an even
+    # grid, proportional bets a geometric one. If that needs more than
+    # max_states states, every step is scaled up to fit.
+    scale = 1
+    while True:
+        points = [0.0]
+        m = 0.0
+        while m < target and len(points) <= max_states:
+            b = _bets(bet, np.array([max(m, 1.0)]))[0]
+            m = min(float(target), m + max(1, math.floor(b / BET_STEPS)) * scale)
+            points.append(m)
+        if m >= target:
+            return np.array(points)
+        scale *= 2
+
+
+def ruin(start, bet, probs, payout=0, target=None, max_states=MAX_STATES):
+    # Solves the bankroll chain from `start` money until ruin or reaching
+    # `target` (default twice start). Returns the ruin probability and the
+    # expected number of rounds. A payoff landing between two grid points
+    # is split between them in proportion, which keeps each step's
+    # expected money exact; on a $1 grid the whole solve is exact.
+    target = 2 * start if target is None else target
+    if not 0 < start < target:
+        raise ValueError("start money must be between 0 and the target")
+    grid = money_grid(bet, target, max_states)
+    top = len(grid) - 1  # grid[0] is ruin, grid[top] the target
+    n = top - 1  # transient points 1 .. top-1 become rows 0 .. n-1
+
+    money = grid[1:top]
+    bets = _bets(bet, money)
+    mult = 1 + payout * PAYOUT_STEP
+    moves = [
+        (probs["blackjack"], np.floor(bets * 1.5)),
+        (probs["win"], np.floor(bets * mult)),
+        (probs["push"], np.zeros(n)),
+        (probs["lose"], -bets),
+    ]
+
+    rows, cols, vals = [], [], []
+    ruined = np.zeros(n)
+    row = np.arange(n)
+    for p, delta in moves:
+        if not p:
+            continue
+        dest = np.clip(money + delta, 0, target)
+        lo = np.minimum(np.searchsorted(grid, dest, side="right") - 1, top - 1)
+        frac = (dest - grid[lo]) / (grid[lo + 1] - grid[lo])
+        for point, weight in ((lo, p * (1 - frac)), (lo + 1, p * frac)):
+            ruined += np.where(point == 0, weight, 0.0)
+            inside = (point > 0) & (point < top) & (weight > 0)
+            rows.append(row[inside])
+            cols.append(point[inside] - 1)
+            vals.append(weight[inside])
+
+    q = sparse.csc_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n))
+    # the chain only moves a few bets at a time, so the system is banded and
+    # factors without fill-in in its natural order
+    lu = splu((sparse.identity(n, format="csc") - q).tocsc(), permc_spec="NATURAL")
+    solved = lu.solve(np.column_stack([ruined, np.ones(n)]))
+
+    # start may fall between grid points
+    ruin_p = np.concatenate([[1.0], solved[:, 0], [0.0]])
+    rounds = np.concatenate([[0.0], solved[:, 1], [0.0]])
+    return {
+        "ruin": float(np.interp(start, grid, ruin_p)),
+        "rounds": float(np.interp(start, grid, rounds)),
+        "states": n,
+    }
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Probability of going broke, solved without simulating.")
+    parser.add_argument("--ai", choices=AI_DIFFICULTIES, default="Normal")
+    parser.add_argument("--cards", type=int, choices=range(0, 3), default=0, help="Starting Luck level")
+    parser.add_argument("--nerves", type=int, choices=range(0, 4), default=0, help="Dealer Nerves level")
+    parser.add_argument("--payout", type=int, choices=range(0, 4), default=0, help="Bonus Payout level")
+    parser.add_argument("--play", choices=sorted(STAND_ON) + ["optimal"], default="stand17")
+    parser.add_argument("--decks", type=int, choices=range(1, 9), default=1)
+    parser.add_argument("--start", type=int, default=1500, help="starting money")
+    parser.add_argument("--target", type=int, default=None, help="stop once money reaches this (default 2x start)")
+    bets = parser.add_mutually_exclusive_group()
+    bets.add_argument("--bet", type=int, default=100, help="flat bet")
+    bets.add_argument("--fraction", type=float, help="bet this share of the bankroll")
+    bets.add_argument("--all-in", action="store_true", help="bet everything every round")
+    parser.add_argument("--max-states", type=int, default=MAX_STATES)
+    args = parser.parse_args(argv)
+
+    probs = round_distribution(args.ai, args.cards, args.nerves, args.payout, args.play, args.decks)
+    if args.all_in:
+        policy = all_in
+    elif args.fraction is not None:
+        policy = fraction_bet(args.fraction)
+    else:
+        policy = flat_bet(args.bet)
+    result = ruin(args.start, policy, probs, args.payout, args.target, args.max_states)
+
+    for name in OUTCOMES:
+        print(f"{name + ':':<17}{probs[name]:.4%}")
+    print(f"ev per $1 bet:   {round_ev(probs, args.payout):+.4f}")
+    risk = result["ruin"]
+    print(f"risk of ruin:    {risk:.4%}" if risk >= 1e-6 else f"risk of ruin:    {risk:.3e}")
+    print(f"reach target:    {1 - result['ruin']:.4%}")
+    print(f"expected rounds: {result['rounds']:,.1f}")
+    print(f"states:          {result['states']:,}")
+
+
+if __name__ == "__main__":
+    main()
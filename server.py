@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import random
+
+from engine import AI_DIFFICULTIES, ROULETTE_REVEAL_DELAY, Game, card_rank, card_suit
+from sessionstats import SessionStats
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# -------------------- PROTOCOL --------------------
+# One command per line, words separated by spaces. Every command except
+# "new" and "quit" names the table it is for:
+#
+#   new [seed]                   open a table, reply has its id
+#   bet <table> <amount>         before the deal; clamped to 10..money
+#   ai <table> Easy|Normal|Hard
+#   roulette <table> on|off
+#   upgrade <table> cards|nerves|payout
+#   deal | hit | stand | next | state | close <table>
+#   stats <table>                the table's session statistics so far
+#   quit
+#
+# Each command gets exactly one reply line, a JSON object with "ok" and
+# either the table's state or an "error". A finished round shows up in
+# the reply as "outcome". The roulette reveal happens later, so it is
+# pushed on its own line as {"event": "result", ...state} once the
+# per-table timer fires. Tables close when their connection does.
+
+
+def card_code(card):
+    return card_rank(card) + card_suit(card)[0]
+
+
+def table_state(table_id, g):
+    return {
+        "table": table_id,
+        "money": g.money,
+        "bet": g.bet,
+        "up_points": g.up_points,
+        "ai": g.ai,
+        "roulette": g.roulette,
+        "upgrades": {k: u["lvl"] for k, u in g.upgrades.items()},
+        "dealt": g.dealt,
+        "over": g.over,
+        "outcome": g.outcome,
+        "msg": g.msg,
+        "player": [card_code(c) for c in g.player],
+        "dealer": [card_code(c) for c in g.dealer],
+        "player_value": g.player.value,
+        "dealer_value": g.dealer.value,
+        "rr_running": g.rr_running,
+        "game_over": g.money <= 0,
+    }
+
+
+class CommandError(Exception):
+    pass
+
+
+class TableSession:
+    __slots__ = ("id", "game", "client", "timer", "stats", "recorded")
+
+    def __init__(self, table_id, game, client):
+        self.id = table_id
+        self.game = game
+        self.client = client
+        self.timer = None  # pending roulette reveal
+        self.stats = SessionStats()  # kept for the table's lifetime, across game overs
+        self.recorded = False  # the current round is in stats
+
+    def record_round(self):
+        g = self.game
+        if g.dealt and g.over and not self.recorded:
+            self.stats.record(g)
+            self.recorded = True
+        elif not g.dealt:
+            self.recorded = False
+
+    def cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+# -------------------- SERVER --------------------
+class TableServer:
+    def __init__(self):
+        self.tables = {}
+        self.next_id = 1
+        self.commands = 0
+
+    # ---------------- TABLES ----------------
+    def open_table(self, client, seed=None):
+        rng = random.Random(seed) if seed is not None else random.Random()
+        table = TableSession(self.next_id, Game(rng=rng), client)
+        self.tables[table.id] = table
+        client.add(table.id)
+        self.next_id += 1
+        return table
+
+    def close_table(self, table_id):
+        table = self.tables.pop(table_id, None)
+        if table is not None:
+            table.cancel_timer()
+
+    def table_for(self, client, args):
+        if not args:
+            raise CommandError("missing table id")
+        try:
+            table_id = int(args[0])
+        except ValueError:
+            raise CommandError(f"bad table id {args[0]!r}")
+        if table_id not in client:
+            raise CommandError(f"no table {table_id}")
+        return self.tables[table_id]
+
+    # ---------------- ROULETTE TIMER ----------------
+    def start_reveal(self, table, writer):
+        # replaces the window's USEREVENT timer: the reveal runs on the event
+        # loop later, so the table never blocks anyone else
+        loop = asyncio.get_running_loop()
+        table.timer = loop.call_later(ROULETTE_REVEAL_DELAY, self.reveal, table, writer)
+
+    def reveal(self, table, writer):
+        table.timer = None
+        table.game.resolve_russian_roulette()
+        table.record_round()
+        if not writer.is_closing():
+            event = {"event": "result", **table_state(table.id, table.game)}
+            writer.write(json.dumps(event).encode() + b"\n")
+
+    # ---------------- COMMANDS ----------------
+    def dispatch(self, client, writer, line):
+        words = line.split()
+        if not words:
+            raise CommandError("empty command")
+        cmd, args = words[0].lower(), words[1:]
+        self.commands += 1
+
+        if cmd == "new":
+            seed = args[0] if args else None
+            table = self.open_table(client, seed)
+            return table_state(table.id, table.game)
+
+        table = self.table_for(client, args)
+        g = table.game
+        args = args[1:]
+
+        if cmd == "close":
+            client.discard(table.id)
+            self.close_table(table.id)
+            return {"table": table.id, "closed": True}
+
+        if cmd == "stats":
+            return {"table": table.id, "stats": table.stats.to_dict()}
+
+        if cmd == "state":
+            pass
+
+        elif cmd == "next":
+            if not g.over and g.money > 0:
+                raise CommandError("round is not over")
+            if g.money <= 0:
+                table.game = g = Game(rng=g.rng)  # game over: start again
+            else:
+                g.reset_round()
+
+        elif cmd in ("bet", "ai", "roulette", "upgrade", "deal"):
+            if g.dealt:
+                raise CommandError(f"{cmd} is only allowed before the deal")
+            if g.money <= 0:
+                raise CommandError("game over")
+
+            if cmd == "bet":
+                try:
+                    amount = int(args[0])
+                except (IndexError, ValueError):
+                    raise CommandError("bet needs an amount")
+                g.bet = max(10, min(amount, g.money))
+            elif cmd == "ai":
+                if not args or args[0].capitalize() not in AI_DIFFICULTIES:
+                    raise CommandError(f"ai must be one of {', '.join(AI_DIFFICULTIES)}")
+                g.ai = args[0].capitalize()
+            elif cmd == "roulette":
+                if not args or args[0] not in ("on", "off"):
+                    raise CommandError("roulette needs on or off")
+                g.roulette = args[0] == "on"
+            elif cmd == "upgrade":
+                if not args or args[0] not in g.upgrades:
+                    raise CommandError(f"upgrade must be one of {', '.join(g.upgrades)}")
+                if not g.buy_upgrade(args[0]):
+                    raise CommandError("cannot buy that upgrade")
+            else:
+                g.deal()
+                if g.rr_running:
+                    self.start_reveal(table, writer)
+
+        elif cmd in ("hit", "stand"):
+            if not g.dealt or g.over or g.roulette:
+                raise CommandError(f"cannot {cmd} now")
+            if cmd == "hit":
+                g.hit()
+            else:
+                g.stand()
+
+        else:
+            raise CommandError(f"unknown command {cmd!r}")
+
+        table.record_round()
+        return table_state(table.id, g)
+
+    async def handle_client(self, reader, writer):
+        client = set()  # ids of the tables this connection opened
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode(errors="replace").strip()
+                if line.lower() == "quit":
+                    break
+                try:
+                    reply = {"ok": True, **self.dispatch(client, writer, line)}
+                except CommandError as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for table_id in client:
+                self.close_table(table_id)
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+        if unix:
+            server = await asyncio.start_unix_server(self.handle_client, unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            where = "%s:%d" % server.sockets[0].getsockname()[:2]
+        print(f"serving tables on {where}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many BlackJack tables over a line protocol.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(TableServer().serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
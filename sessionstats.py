@@ -0,0 +1,328 @@
+import argparse
+import json
+import math
+
+from engine import RANKS, card_rank
+
+# Streaming statistics for a session of any length. Every metric keeps a
+# fixed amount of state however many rounds it sees, and two collectors
+# can be merged, so simulate.py workers each keep their own and combine
+# them at the end.
+OUTCOMES = ["win", "blackjack", "push", "lose"]
+QUANTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+# -------------------- RUNNING MEAN / VARIANCE --------------------
+class RunningStats:
+    # Welford's algorithm: mean and variance in one pass without the
+    # cancellation of summing squares
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other):
+        # Chan et al.'s pairwise update
+        if not other.n:
+            return
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.mean += d * other.n / n
+        self.m2 += other.m2 + d * d * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def to_dict(self):
+        return {"count": self.n, "mean": self.mean, "sd": math.sqrt(self.variance),
+                "min": self.min if self.n else None, "max": self.max if self.n else None}
+
+
+# -------------------- HISTOGRAM --------------------
+class Histogram:
+    # fixed-width bins over [lo, hi), plus counts below and above the range
+    __slots__ = ("lo", "hi", "width", "counts", "under", "over")
+
+    def __init__(self, lo, hi, bins):
+        self.lo = lo
+        self.hi = hi
+        self.width = (hi - lo) / bins
+        self.counts = [0] * bins
+        self.under = 0
+        self.over = 0
+
+    def add(self, x):
+        if x < self.lo:
+            self.under += 1
+        elif x >= self.hi:
+            self.over += 1
+        else:
+            self.counts[min(int((x - self.lo) / self.width), len(self.counts) - 1)] += 1
+
+    def merge(self, other):
+        if (other.lo, other.hi, len(other.counts)) != (self.lo, self.hi, len(self.counts)):
+            raise ValueError("histograms have different bins")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.under += other.under
+        self.over += other.over
+
+    def to_dict(self):
+        return {"lo": self.lo, "hi": self.hi, "width": self.width, "counts": self.counts,
+                "under": self.under, "over": self.over}
+
+
+# -------------------- QUANTILE SKETCH --------------------
+class QuantileSketch:
+    # Logarithmic buckets in the style of DDSketch: a value x > 0 lands in
+    # bucket ceil(log_gamma(x)), so every quantile comes back within
+    # `accuracy` of the true value, relative to it. Negative values mirror
+    # that. Buckets add up when sketches merge. Past max_bins buckets on
+    # one side, the ones nearest zero are folded together, so memory stays
+    # bounded and only the smallest magnitudes lose accuracy.
+    __slots__ = ("accuracy", "gamma", "log_gamma", "max_bins", "pos", "neg", "zeros", "count")
+
+    def __init__(self, accuracy=0.01, max_bins=1024):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.pos = {}  # bucket -> count
+        self.neg = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, x):
+        self.count += 1
+        if x > 0:
+            store = self.pos
+        elif x < 0:
+            store, x = self.neg, -x
+        else:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(x) / self.log_gamma)
+        store[key] = store.get(key, 0) + 1
+        if len(store) > self.max_bins:
+            self._collapse(store)
+
+    def _collapse(self, store):
+        keys = sorted(store)
+        folded = keys[:len(keys) - self.max_bins + 1]
+        total = sum(store.pop(k) for k in folded)
+        store[folded[-1]] = total
+
+    def merge(self, other):
+        if other.accuracy != self.accuracy:
+            raise ValueError("sketches have different accuracy")
+        for store, theirs in ((self.pos, other.pos), (self.neg, other.neg)):
+            for key, n in theirs.items():
+                store[key] = store.get(key, 0) + n
+            if len(store) > self.max_bins:
+                self._collapse(store)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def _value(self, key):
+        # the point of the bucket (gamma^(key-1), gamma^key] with the least
+        # relative error to anything in it
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        # q in 0..1; None before anything was added
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.neg, reverse=True):
+            seen += self.neg[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.pos):
+            seen += self.pos[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.pos))
+
+    def to_dict(self):
+        return {f"p{q}": self.quantile(q / 100) for q in QUANTILES}
+
+
+# -------------------- METRICS --------------------
+class Distribution:
+    # one metric: running moments, a histogram and a quantile sketch
+    __slots__ = ("stats", "histogram", "sketch")
+
+    def __init__(self, lo, hi, bins):
+        self.stats = RunningStats()
+        self.histogram = Histogram(lo, hi, bins)
+        self.sketch = QuantileSketch()
+
+    def add(self, x):
+        self.stats.add(x)
+        self.histogram.add(x)
+        self.sketch.add(x)
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.histogram.merge(other.histogram)
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self):
+        # a bucket's midpoint can fall just outside what was seen
+        lo, hi = self.stats.min, self.stats.max
+        quantiles = {k: v if v is None else min(max(v, lo), hi) for k, v in self.sketch.to_dict().items()}
+        return {**self.stats.to_dict(), "quantiles": quantiles, "histogram": self.histogram.to_dict()}
+
+
+class SessionStats:
+    # Fed one finished round at a time with record(g), the way round logs
+    # are: every way a round ends (win(), lose(), pushes, Blackjacks, busts,
+    # the roulette reveal) leaves its outcome, money and hands on the Game,
+    # so one call per round sees them all.
+    # money_range=None skips the bankroll metric, e.g. for simulate.py's
+    # bottomless bankroll
+    def __init__(self, delta_range=(-500, 500), money_range=(0, 10000)):
+        self.rounds = 0
+        self.hands = 0
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.delta = Distribution(*delta_range, 40)  # money won or lost per blackjack round
+        self.player_total = Distribution(2, 32, 30)  # final totals, over 21 is a bust
+        self.dealer_total = Distribution(2, 32, 30)  # only rounds where the dealer played out
+        self.money = Distribution(*money_range, 40) if money_range else None  # bankroll after each round
+        self.dealer_turns = 0
+        self.burned = dict.fromkeys(RANKS, 0)  # Dealer Nerves burns by rank
+        self.roulette = {"pulls": 0, "survived": 0, "died": 0, "best_streak": 0}
+        self.roulette_delta = RunningStats()
+
+    def record(self, g):
+        # g is a finished Game, or a multi-seat Table
+        if not g.over:
+            raise ValueError("only finished rounds can be recorded")
+        self.rounds += 1
+        if self.money:
+            self.money.add(g.money)
+        delta = g.money - g.start_money
+
+        if g.roulette:
+            rr = self.roulette
+            rr["pulls"] += 1
+            if g.rr_result:
+                rr["died"] += 1
+            else:
+                rr["survived"] += 1
+                rr["best_streak"] = max(rr["best_streak"], g.rr_streak)
+            self.roulette_delta.add(delta)
+            return
+
+        self.delta.add(delta)
+        hands = zip(g.hands, g.outcomes) if hasattr(g, "hands") else ((g.player, g.outcome),)
+        for hand, outcome in hands:
+            self.hands += 1
+            self.outcomes[outcome] += 1
+            self.player_total.add(hand.value)
+        if g.stood:
+            self.dealer_turns += 1
+            self.dealer_total.add(g.dealer.value)
+        if g.burned is not None:
+            self.burned[card_rank(g.burned)] += 1
+
+    def merge(self, other):
+        self.rounds += other.rounds
+        self.hands += other.hands
+        self.dealer_turns += other.dealer_turns
+        for counts, theirs in ((self.outcomes, other.outcomes), (self.burned, other.burned)):
+            for key, n in theirs.items():
+                counts[key] += n
+        for name in ("delta", "player_total", "dealer_total", "money"):
+            if getattr(self, name):
+                getattr(self, name).merge(getattr(other, name))
+        rr = self.roulette
+        for key in ("pulls", "survived", "died"):
+            rr[key] += other.roulette[key]
+        rr["best_streak"] = max(rr["best_streak"], other.roulette["best_streak"])
+        self.roulette_delta.merge(other.roulette_delta)
+
+    @property
+    def burns(self):
+        return sum(self.burned.values())
+
+    def to_dict(self):
+        return {
+            "rounds": self.rounds,
+            "hands": self.hands,
+            "outcomes": self.outcomes,
+            "delta": self.delta.to_dict(),
+            "player_total": self.player_total.to_dict(),
+            "dealer_total": self.dealer_total.to_dict(),
+            "money": self.money.to_dict() if self.money else None,
+            "burns": {"count": self.burns, "dealer_turns": self.dealer_turns, "by_rank": self.burned},
+            "roulette": {**self.roulette, "delta": self.roulette_delta.to_dict()},
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+
+# -------------------- SUMMARY --------------------
+def _moments(d, fmt):
+    sign = "+" if fmt[0] == "+" else ""
+    return f"mean {d['mean']:{sign},.2f}  sd {d['sd']:,.2f}  min {d['min']:,}  max {d['max']:,}"
+
+
+def _quantiles(d, fmt):
+    return "  ".join(f"{k} {v:{fmt}}" for k, v in d["quantiles"].items())
+
+
+def print_summary(d):
+    # d is SessionStats.to_dict(), or a dump read back from disk
+    hands = d["hands"]
+    print(f"rounds:          {d['rounds']:,} ({hands:,} hands)")
+    if hands:
+        print("outcomes:        " + "  ".join(f"{k} {n / hands:.2%}" for k, n in d["outcomes"].items()))
+    for label, key, fmt in (("$ / round:", "delta", "+,.0f"), ("player total:", "player_total", ".0f"),
+                            ("dealer total:", "dealer_total", ".0f"), ("money:", "money", ",.0f")):
+        if d[key] and d[key]["count"]:
+            print(f"{label:<17}{_moments(d[key], fmt)}")
+            print(f"{'':<17}{_quantiles(d[key], fmt)}")
+    burns = d["burns"]
+    if burns["count"]:
+        print(f"burns:           {burns['count']:,} in {burns['dealer_turns']:,} dealer turns ({burns['count'] / burns['dealer_turns']:.2%})")
+    rr = d["roulette"]
+    if rr["pulls"]:
+        print(f"roulette:        {rr['pulls']:,} pulls, {rr['survived']:,} survived, {rr['died']:,} died, "
+              f"best streak {rr['best_streak']}")
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a saved session statistics dump.")
+    parser.add_argument("dump", help="JSON written by --stats in game.py or simulate.py")
+    args = parser.parse_args(argv)
+    with open(args.dump) as f:
+        print_summary(json.load(f))
+
+
+if __name__ == "__main__":
+    main()
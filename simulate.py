@@ -0,0 +1,241 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch import play_rounds
+from engine import AI_DIFFICULTIES, MAX_SEATS, Game, Table
+from roundlog import RoundWriter, pack_round
+from sessionstats import SessionStats, print_summary
+from strategy import load_table
+
+# large enough that the bet is never clamped and money never hits 0
+SIM_BANKROLL = 10 ** 15
+
+
+# -------------------- PLAYER POLICIES --------------------
+# a policy looks at the game mid-round and returns True to hit, False to stand
+def stand_on(threshold):
+    def policy(g):
+        return g.player.value < threshold
+    return policy
+
+
+# hit below this total; --fast and ruin.py play these too
+STAND_ON = {
+    "stand17": 17,  # same rule as a Normal dealer
+    "stand15": 15,
+    "stand12": 12,  # never risk a bust
+    "never_hit": 0,
+}
+
+POLICIES = {name: stand_on(threshold) for name, threshold in STAND_ON.items()}
+POLICIES["optimal"] = None  # strategy.py table for the simulated rule set
+
+
+# -------------------- SIMULATION --------------------
+# Rounds are split into fixed-size chunks, and chunk i always gets its own
+# RNG seeded from (seed, i) and a fresh Game. The totals only depend on the
+# seed, never on how many workers the chunks were spread over.
+CHUNK_ROUNDS = 20000
+FAST_CHUNK_ROUNDS = 100000  # --fast keeps a whole shoe per round in memory
+
+
+def resolve_policy(policy, ai, nerves, payout, decks):
+    if policy == "optimal":
+        return load_table(ai, nerves, payout, decks).policy
+    return POLICIES[policy] if isinstance(policy, str) else policy
+
+
+def chunk_config(policy="stand17", ai="Normal", cards=0, nerves=0, payout=0, bet=100,
+                 decks=1, penetration=0.75, log=False, seats=1, stats=False, fast=False):
+    # everything play_chunk() reads; build it here so callers get every key
+    return {"policy": policy, "ai": ai, "cards": cards, "nerves": nerves, "payout": payout,
+            "bet": bet, "decks": decks, "penetration": penetration, "log": log,
+            "seats": seats, "stats": stats, "fast": fast}
+
+
+def play_chunk(job):
+    index, rounds, seed, config = job
+    if config["fast"]:
+        counts = play_rounds(rounds, STAND_ON[config["policy"]], config["ai"], config["cards"],
+                             config["nerves"], config["payout"], config["bet"], config["decks"],
+                             random.Random(f"{seed}:{index}").getrandbits(64))
+        return {**counts, "log": None, "session": None}
+    decide = resolve_policy(config["policy"], config["ai"], config["nerves"],
+                            config["payout"], config["decks"])
+
+    rng = random.Random(f"{seed}:{index}")
+    seats = config["seats"]
+    if seats == 1:
+        g = Game(config["decks"], config["penetration"], rng)
+    else:
+        g = Table(seats, config["decks"], config["penetration"], rng)
+    g.ai = config["ai"]
+    g.upgrades["cards"]["lvl"] = config["cards"]
+    g.upgrades["nerves"]["lvl"] = config["nerves"]
+    g.upgrades["payout"]["lvl"] = config["payout"]
+    g.money = SIM_BANKROLL
+    g.bet = config["bet"]
+
+    counts = {"win": 0, "blackjack": 0, "push": 0, "lose": 0, "delta": 0}
+    log = bytearray() if config["log"] else None
+    session = session_stats(config) if config["stats"] else None
+    for _ in range(rounds):
+        g.reset_round()
+        before = g.money
+        g.deal()
+        while not g.over:
+            if decide(g):
+                g.hit()
+            else:
+                g.stand()
+        if seats == 1:
+            counts[g.outcome] += 1
+        else:
+            for outcome in g.outcomes:
+                counts[outcome] += 1
+        counts["delta"] += g.money - before
+        if log is not None:
+            log += pack_round(g)
+        if session:
+            session.record(g)
+    counts["log"] = log
+    counts["session"] = session
+    return counts
+
+
+def session_stats(config):
+    # histogram bins sized to the bet; the bankroll is bottomless, so not tracked
+    reach = 2 * config["bet"] * config["seats"]
+    return SessionStats(delta_range=(-reach, reach), money_range=None)
+
+
+def simulate(rounds, policy="stand17", ai="Normal", cards=0, nerves=0, payout=0,
+             bet=100, seed=None, decks=1, penetration=0.75, workers=1, log=None, seats=1,
+             stats=False, fast=False):
+    # with seats > 1 every round plays that many hands at one table, and
+    # the rates and mean_delta are per hand; stats=True adds the full
+    # distributions as a SessionStats under "session". fast=True plays
+    # threshold policies with batch.play_rounds, each round from a fresh
+    # shoe: no penetration, and Starting Luck rerolls no longer thin out
+    # the aces and tens of later rounds, so its rates are close to the
+    # Game path's but not the same.
+    if ai not in AI_DIFFICULTIES:
+        raise ValueError(f"unknown AI difficulty {ai!r}, expected one of {AI_DIFFICULTIES}")
+    if log and seats > 1:
+        raise ValueError("round logs hold single-seat rounds only")
+    if fast and (policy not in STAND_ON or log or stats or seats > 1):
+        raise ValueError(f"fast mode plays single-seat {', '.join(STAND_ON)} rounds "
+                         "without logs or session stats")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    # solve/cache the strategy table once here rather than racing in workers
+    resolve_policy(policy, ai, nerves, payout, decks)
+
+    config = chunk_config(policy, ai, cards, nerves, payout, bet, decks, penetration,
+                          log is not None, seats, stats, fast)
+    chunk = FAST_CHUNK_ROUNDS if fast else CHUNK_ROUNDS
+    jobs = [(i, min(chunk, rounds - start), seed, config)
+            for i, start in enumerate(range(0, rounds, chunk))]
+
+    totals = dict.fromkeys(("win", "blackjack", "push", "lose", "delta"), 0)
+    writer = RoundWriter(log) if log else None
+    session = session_stats(config) if stats else None
+
+    def collect(results):
+        # chunks arrive in order, so the log is the same for any worker count
+        for r in results:
+            for key in totals:
+                totals[key] += r[key]
+            if writer:
+                writer.extend(r["log"])
+            if session:
+                session.merge(r["session"])
+
+    start = time.perf_counter()
+    try:
+        if workers == 1:
+            collect(map(play_chunk, jobs))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                collect(pool.map(play_chunk, jobs))
+    finally:
+        if writer:
+            writer.close()
+    elapsed = time.perf_counter() - start
+
+    n = max(rounds * seats, 1)
+    return {
+        "rounds": rounds,
+        "seed": seed,
+        "workers": workers,
+        "seats": seats,
+        "win_rate": (totals["win"] + totals["blackjack"]) / n,
+        "push_rate": totals["push"] / n,
+        "loss_rate": totals["lose"] / n,
+        "blackjack_rate": totals["blackjack"] / n,
+        "mean_delta": totals["delta"] / n,
+        "seconds": elapsed,
+        "rounds_per_sec": rounds / elapsed if elapsed else float("inf"),
+        "hands_per_sec": rounds * seats / elapsed if elapsed else float("inf"),
+        "session": session,
+    }
+
+
+def print_report(stats):
+    print(f"rounds:          {stats['rounds']:,}")
+    print(f"win rate:        {stats['win_rate']:.4%}")
+    print(f"push rate:       {stats['push_rate']:.4%}")
+    print(f"loss rate:       {stats['loss_rate']:.4%}")
+    print(f"blackjack rate:  {stats['blackjack_rate']:.4%}")
+    unit = "hand:" if stats["seats"] > 1 else "round:"
+    print(f"{'mean $ / ' + unit:<17}{stats['mean_delta']:+.3f}")
+    print(f"seed:            {stats['seed']}")
+    print(f"throughput:      {stats['rounds_per_sec']:,.0f} rounds/s on {stats['workers']} worker(s)")
+    if stats["seats"] > 1:
+        print(f"                 {stats['hands_per_sec']:,.0f} hands/s at {stats['seats']} seats")
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many BlackJack rounds without the UI.")
+    parser.add_argument("-n", "--rounds", type=int, default=100000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="stand17")
+    parser.add_argument("--ai", choices=AI_DIFFICULTIES, default="Normal")
+    parser.add_argument("--cards", type=int, choices=range(0, 3), default=0, help="Starting Luck level")
+    parser.add_argument("--nerves", type=int, choices=range(0, 4), default=0, help="Dealer Nerves level")
+    parser.add_argument("--payout", type=int, choices=range(0, 4), default=0, help="Bonus Payout level")
+    parser.add_argument("--bet", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--decks", type=int, choices=range(1, 9), default=1, help="decks in the shoe")
+    parser.add_argument("--penetration", type=float, default=0.75,
+                        help="fraction of the shoe dealt before reshuffling")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (results do not depend on this)")
+    parser.add_argument("--seats", type=int, choices=range(1, MAX_SEATS + 1), default=1,
+                        help="hands played per round at one table; rates are then per hand")
+    parser.add_argument("--log", metavar="FILE", default=None,
+                        help="append every round to a binary round log (see roundlog.py)")
+    parser.add_argument("--fast", action="store_true",
+                        help="vectorized rounds, each from a fresh shoe (threshold policies only)")
+    parser.add_argument("--stats", metavar="FILE", default=None,
+                        help="print full distributions and write them to FILE as JSON (see sessionstats.py)")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = simulate(args.rounds, args.policy, args.ai, args.cards, args.nerves,
+                         args.payout, args.bet, args.seed, args.decks, args.penetration,
+                         args.workers, args.log, args.seats, args.stats is not None, args.fast)
+    except ValueError as e:
+        parser.error(str(e))
+    print_report(stats)
+    if args.stats:
+        print()
+        print_summary(stats["session"].to_dict())
+        stats["session"].dump(args.stats)
+
+
+if __name__ == "__main__":
+    main()
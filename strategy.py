@@ -0,0 +1,200 @@
+import argparse
+import hashlib
+import json
+import os
+from array import array
+from functools import lru_cache
+
+from engine import AI_DIFFICULTIES, DEALER_THRESHOLDS, HARD_VALUES, NERVES_BURN_CHANCE, PAYOUT_STEP, hand_total
+from odds import BUST, dealer_upcard_distribution
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HERE, "strategy_cache")
+# bump when the solver changes in a way the rule fingerprint below misses
+CACHE_VERSION = 1
+
+# Player states are (total, soft). Hard totals 4-21 and soft totals 12-21
+# each get a row; dealer upcards are hard values 1-10 (ace = 1, tens and
+# faces = 10). A table stores the EV of standing and of hitting, per unit
+# bet, for every row x upcard.
+HARD_TOTALS = range(4, 22)
+SOFT_TOTALS = range(12, 22)
+ROWS = len(HARD_TOTALS) + len(SOFT_TOTALS)
+UPCARDS = range(1, 11)
+CELLS = ROWS * len(UPCARDS)
+
+
+def _row(total, soft):
+    if soft:
+        return len(HARD_TOTALS) + total - SOFT_TOTALS.start
+    return total - HARD_TOTALS.start
+
+
+# -------------------- STRATEGY TABLE --------------------
+class StrategyTable:
+    def __init__(self, stand, hit):
+        self.stand = stand  # array('f') of CELLS EVs, row-major by player state
+        self.hit = hit
+
+    def ev(self, total, soft, upcard):
+        # upcard is an engine card (0-51)
+        i = _row(total, soft) * len(UPCARDS) + HARD_VALUES[upcard] - 1
+        return self.stand[i], self.hit[i]
+
+    def should_hit(self, total, soft, upcard):
+        stand, hit = self.ev(total, soft, upcard)
+        return hit > stand
+
+    def should_hit_value(self, total, soft, up):
+        # like should_hit, with the upcard as its hard value 1-10 (ace = 1)
+        i = _row(total, soft) * len(UPCARDS) + up - 1
+        return self.hit[i] > self.stand[i]
+
+    def policy(self, g):
+        # usable as a simulate.py player policy
+        return self.should_hit(g.player.value, g.player.soft, g.dealer[0])
+
+    def to_bytes(self):
+        return self.stand.tobytes() + self.hit.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        stand, hit = array('f'), array('f')
+        half = len(data) // 2
+        stand.frombytes(data[:half])
+        hit.frombytes(data[half:])
+        if len(stand) != CELLS or len(hit) != CELLS:
+            raise ValueError("strategy table has the wrong size")
+        return cls(stand, hit)
+
+
+# -------------------- SOLVER --------------------
+def hit_outcomes(total, soft, draw):
+    # The hands one hit can lead to, as (p, new total, new soft) for each
+    # (hard value, p) in draw; a new total over 21 is a bust. solve() and
+    # ruin.py both recurse on this.
+    hard = total - 10 if soft else total
+    for k, p in draw:
+        has_ace = soft or k == 1
+        new_total = hand_total(hard + k, has_ace)
+        yield p, new_total, new_total != hard + k
+
+
+def fresh_composition(decks):
+    # counts of hard values 1-10 in a full shoe
+    return tuple(4 * decks for _ in range(9)) + (16 * decks,)
+
+
+def solve(ai="Normal", nerves=0, payout=0, decks=1):
+    # Expected value of hit vs stand for this rule set. The dealer side is
+    # exact for a fresh shoe minus the upcard; player draws use that same
+    # composition (the player's own cards are not removed), which keeps the
+    # table independent of the exact player hand.
+    win = 1 + payout * PAYOUT_STEP
+    stand = array('f', bytes(4 * CELLS))
+    hit = array('f', bytes(4 * CELLS))
+
+    for up in UPCARDS:
+        comp = list(fresh_composition(decks))
+        comp[up - 1] -= 1
+        comp = tuple(comp)
+        dealer = dealer_upcard_distribution(up, comp, ai, nerves)
+        left = sum(comp)
+        draw = [(k + 1, count / left) for k, count in enumerate(comp) if count]
+
+        def ev_stand(total):
+            ev = dealer[BUST] * win
+            for d in range(BUST):
+                if total > d:
+                    ev += dealer[d] * win
+                elif total < d:
+                    ev -= dealer[d]
+            return ev
+
+        @lru_cache(maxsize=None)
+        def ev_best(total, soft):
+            return max(ev_stand(total), ev_hit(total, soft))
+
+        def ev_hit(total, soft):
+            ev = 0.0
+            for p, new_total, new_soft in hit_outcomes(total, soft, draw):
+                ev += p * (-1.0 if new_total > 21 else ev_best(new_total, new_soft))
+            return ev
+
+        for total in HARD_TOTALS:
+            i = _row(total, False) * len(UPCARDS) + up - 1
+            stand[i] = ev_stand(total)
+            hit[i] = ev_hit(total, False)
+        for total in SOFT_TOTALS:
+            i = _row(total, True) * len(UPCARDS) + up - 1
+            stand[i] = ev_stand(total)
+            hit[i] = ev_hit(total, True)
+
+    return StrategyTable(stand, hit)
+
+
+# -------------------- ON-DISK CACHE --------------------
+def rules_fingerprint(ai, nerves, payout):
+    # the rule values a table was solved for, so a tweak to the dealer
+    # thresholds, burn chances or payout step misses the old files
+    rules = {"version": CACHE_VERSION, "dealer_stands_on": DEALER_THRESHOLDS[ai] + nerves,
+             "burn_chance": NERVES_BURN_CHANCE[nerves], "win_multiplier": 1 + payout * PAYOUT_STEP}
+    return hashlib.sha1(json.dumps(rules, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def cache_path(ai, nerves, payout, decks, cache_dir=CACHE_DIR):
+    name = f"{ai.lower()}-n{nerves}-p{payout}-d{decks}-{rules_fingerprint(ai, nerves, payout)}.bin"
+    return os.path.join(cache_dir, name)
+
+
+def load_table(ai="Normal", nerves=0, payout=0, decks=1, cache_dir=CACHE_DIR):
+    path = cache_path(ai, nerves, payout, decks, cache_dir)
+    try:
+        with open(path, "rb") as f:
+            return StrategyTable.from_bytes(f.read())
+    except (OSError, ValueError):
+        pass
+
+    table = solve(ai, nerves, payout, decks)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(table.to_bytes())
+    os.replace(tmp, path)
+    return table
+
+
+# -------------------- PROGRAM ENTRY --------------------
+def print_table(table):
+    print("      " + " ".join(f"{'A' if up == 1 else up:>3}" for up in UPCARDS))
+    for soft, totals in ((False, HARD_TOTALS), (True, SOFT_TOTALS)):
+        for total in totals:
+            cells = []
+            for up in UPCARDS:
+                i = _row(total, soft) * len(UPCARDS) + up - 1
+                cells.append("  H" if table.hit[i] > table.stand[i] else "  S")
+            print(f"{'S' if soft else 'H'}{total:>3}  " + " ".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Best hit/stand play for each rule set.")
+    parser.add_argument("--ai", choices=AI_DIFFICULTIES, default="Normal")
+    parser.add_argument("--nerves", type=int, choices=range(0, 4), default=0)
+    parser.add_argument("--payout", type=int, choices=range(0, 4), default=0)
+    parser.add_argument("--decks", type=int, choices=range(1, 9), default=1)
+    parser.add_argument("--all", action="store_true", help="solve and cache every rule set")
+    args = parser.parse_args(argv)
+
+    if args.all:
+        for ai in AI_DIFFICULTIES:
+            for nerves in range(4):
+                for payout in range(4):
+                    load_table(ai, nerves, payout, args.decks)
+        print(f"cached {len(AI_DIFFICULTIES) * 16} tables in {CACHE_DIR}")
+        return
+
+    print_table(load_table(args.ai, args.nerves, args.payout, args.decks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import random
+
+import pytest
+
+from bench import check_starting_luck_distribution
+from engine import (DECK_SIZE, HARD_VALUES, IS_ACE, Game, Hand, Shoe, Table, hand_total,
+                    hand_value)
+
+# Regression checks for the engine's fast paths: the Starting Luck reroll,
+# Hand's running totals, Shoe's card index and the save formats. Run with
+# python -m pytest -q test_engine.py
+
+
+# -------------------- STARTING LUCK --------------------
+def test_starting_luck_distribution():
+    # same value distribution as the legacy reroll, at every level
+    assert check_starting_luck_distribution(samples=50000)
+
+
+# -------------------- HAND --------------------
+def assert_totals(hand):
+    cards = list(hand)
+    hard = sum(HARD_VALUES[c] for c in cards)
+    has_ace = any(IS_ACE[c] for c in cards)
+    assert (hand.hard, hand.aces) == (hard, sum(IS_ACE[c] for c in cards))
+    assert hand.value == hand_value(cards) == hand_total(hard, has_ace)
+    assert hand.soft == (has_ace and hard <= 11)
+
+
+MUTATORS = {
+    "append": lambda h: h.append(0),
+    "insert": lambda h: h.insert(1, 12),
+    "extend": lambda h: h.extend([13, 26]),
+    "remove": lambda h: h.remove(9),
+    "pop": lambda h: h.pop(),
+    "pop_index": lambda h: h.pop(0),
+    "clear": lambda h: h.clear(),
+    "iadd": lambda h: h.__iadd__([0, 1]),
+    "imul": lambda h: h.__imul__(2),
+    "setitem": lambda h: h.__setitem__(0, 0),
+    "slice_set": lambda h: h.__setitem__(slice(0, 2), [0, 13, 26]),
+    "delitem": lambda h: h.__delitem__(0),
+    "slice_del": lambda h: h.__delitem__(slice(1, None)),
+}
+
+
+@pytest.mark.parametrize("name", sorted(MUTATORS))
+@pytest.mark.parametrize("cards", [[5, 9], [0, 9], [0, 13, 5], [11, 12, 9]])
+def test_hand_totals_after_mutation(name, cards):
+    hand = Hand(cards)
+    if name == "remove" and 9 not in hand:
+        hand.append(9)
+    MUTATORS[name](hand)
+    assert_totals(hand)
+    assert_totals(hand.copy())
+
+
+def test_hand_augmented_assignment():
+    hand = Hand([0, 5])
+    hand += [13]
+    assert isinstance(hand, Hand)
+    assert_totals(hand)
+    hand *= 3
+    assert isinstance(hand, Hand)
+    assert_totals(hand)
+
+
+# -------------------- SHOE --------------------
+def assert_index(shoe):
+    where = shoe.where or shoe._index()
+    for card in range(DECK_SIZE):
+        assert sorted(where[card]) == [i for i, c in enumerate(shoe.cards) if c == card]
+
+
+@pytest.mark.parametrize("decks", [1, 6])
+def test_shoe_index_after_pops_and_removes(decks):
+    rng = random.Random(decks)
+    shoe = Shoe(decks, rng=rng)
+    for step in range(shoe.size - 1):
+        if step % 3:
+            shoe.remove(rng.choice(shoe.cards))
+        else:
+            shoe.pop()
+        if step % 7 == 0:
+            assert_index(shoe)
+    assert_index(shoe)
+    assert len(shoe) == 1
+
+
+def test_shoe_copy_rebuilds_index():
+    shoe = Shoe(2, rng=random.Random(5))
+    shoe.pop()
+    copy = shoe.copy()
+    assert copy.where is None
+    copy.remove(copy.cards[0])
+    assert_index(copy)
+    assert_index(shoe)
+    assert len(shoe) == len(copy) + 1
+
+
+def test_shoe_remove_missing_card():
+    shoe = Shoe(rng=random.Random(2))
+    card = shoe.cards[0]
+    shoe.remove(card)
+    with pytest.raises(ValueError):
+        shoe.remove(card)
+
+
+# -------------------- SAVE FORMAT --------------------
+def mid_round_game():
+    g = Game(decks=2, rng=random.Random(7))
+    g.upgrades["cards"]["lvl"] = 2
+    g.upgrades["nerves"]["lvl"] = 1
+    g.deal()
+    while not g.over and g.player.value < 15:
+        g.hit()
+    return g
+
+
+def mid_round_table():
+    t = Table(seats=4, decks=2, rng=random.Random(7))
+    t.deal()
+    while not t.over and t.active < 2:
+        t.stand()
+    return t
+
+
+def test_game_round_trip():
+    g = mid_round_game()
+    data = g.to_bytes()
+    loaded = Game.from_bytes(data)
+    assert type(loaded) is Game
+    assert loaded.to_bytes() == data
+    assert loaded.snapshot() == g.snapshot()
+
+
+@pytest.mark.parametrize("finish", [False, True])
+def test_table_round_trip(finish):
+    t = mid_round_table()
+    while finish and not t.over:
+        t.stand()
+    data = t.to_bytes()
+    loaded = Table.from_bytes(data)
+    assert type(loaded) is Table
+    assert loaded.to_bytes() == data
+    assert loaded.snapshot() == t.snapshot()
+    assert loaded.player is loaded.hands[loaded.active]
+
+
+def test_save_formats_do_not_mix():
+    with pytest.raises(ValueError):
+        Game.from_bytes(mid_round_table().to_bytes())
+    with pytest.raises(ValueError):
+        Table.from_bytes(mid_round_game().to_bytes())